@@ -0,0 +1,134 @@
+"""Tempos das etapas do cronograma em planilhas sintéticas de 1k, 10k e 100k linhas.
+
+Roda sem Streamlit e sem rede; os resultados vão para um JSON que pode ser
+comparado com uma execução anterior (--comparar).
+
+Uso: python benchmarks/bench_cronograma.py [--tamanhos 1000 10000 100000] [--saida resultados.json]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cronograma_core import CronogramaAnalyzer, ler_planilha_folgas  # noqa: E402
+from cronograma_mapas import create_map  # noqa: E402
+from sintetico import gerar_folgas  # noqa: E402
+
+DATA_REFERENCIA = date(2024, 6, 1)
+
+
+def _sem_cache(analyzer: CronogramaAnalyzer) -> CronogramaAnalyzer:
+    # As tabelas derivadas ficam em cache por versão; cada repetição recalcula do zero
+    analyzer._tabelas.clear()
+    return analyzer
+
+
+def preparar_etapas(df: pd.DataFrame, conteudo: bytes) -> dict:
+    """Etapa -> função sem argumentos que executa apenas aquela etapa"""
+    analyzer = CronogramaAnalyzer(df)
+    return {
+        'read_excel': lambda: pd.read_excel(io.BytesIO(conteudo), engine='openpyxl'),
+        'ler_planilha_folgas': lambda: ler_planilha_folgas(io.BytesIO(conteudo)),
+        'process_data': lambda: CronogramaAnalyzer(df).df,  # Inclui add_coordinates, como no app
+        'add_coordinates': lambda: analyzer.add_coordinates(),
+        'get_status_atual': lambda: _sem_cache(analyzer).get_status_atual(DATA_REFERENCIA),
+        'audit_folgas': lambda: _sem_cache(analyzer).audit_folgas(),
+        'create_map': lambda: create_map(analyzer.df),
+        'create_map_html': lambda: create_map(analyzer.df).get_root().render(),
+    }
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    medida = {'segundos_min': min(tempos), 'segundos_mediana': statistics.median(tempos), 'repeticoes': repeticoes}
+    if isinstance(resultado, pd.DataFrame):
+        medida['linhas_resultado'] = len(resultado)
+    elif isinstance(resultado, str):
+        medida['bytes_resultado'] = len(resultado.encode('utf-8'))
+    return medida
+
+
+def metadados() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def comparar(resultados: list, caminho_anterior: str):
+    """Imprime a razão (atual / anterior) do tempo mínimo de cada etapa"""
+    with open(caminho_anterior, encoding='utf-8') as arquivo:
+        anteriores = {(r['linhas'], r['etapa']): r for r in json.load(arquivo)['resultados']}
+
+    print(f"\nComparação com {caminho_anterior}:")
+    for resultado in resultados:
+        anterior = anteriores.get((resultado['linhas'], resultado['etapa']))
+        if anterior:
+            razao = resultado['segundos_min'] / anterior['segundos_min']
+            alerta = "  <-- mais lento" if razao > 1.2 else ""
+            print(f"{resultado['linhas']:>7} {resultado['etapa']:<20} {anterior['segundos_min']:8.3f} s -> "
+                  f"{resultado['segundos_min']:8.3f} s ({razao:.2f}x){alerta}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--etapas', nargs='+', help="Subconjunto das etapas (padrão: todas)")
+    parser.add_argument('--saida', default=f"bench_cronograma_{datetime.now():%Y%m%d_%H%M%S}.json")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for linhas in args.tamanhos:
+        df = gerar_folgas(linhas)
+        conteudo = b''
+        if args.etapas is None or {'read_excel', 'ler_planilha_folgas'} & set(args.etapas):
+            buffer = io.BytesIO()
+            df.to_excel(buffer, index=False)
+            conteudo = buffer.getvalue()
+
+        for etapa, funcao in preparar_etapas(df, conteudo).items():
+            if args.etapas and etapa not in args.etapas:
+                continue
+            medida = medir(funcao, args.repeticoes)
+            resultados.append({'linhas': linhas, 'etapa': etapa, **medida})
+            print(f"{linhas:>7} {etapa:<20} {medida['segundos_min']:8.3f} s (mediana {medida['segundos_mediana']:.3f} s)")
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump({'metadados': metadados(), 'resultados': resultados}, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Compara a leitura completa da planilha com a leitura seletiva em blocos.
+
+Uso: python benchmarks/bench_leitura_planilha.py [--linhas 100000]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cronograma_sharepoint import SharePointConnector, _acumular_blocos, _ler_conteudo  # noqa: E402
+from sintetico import gerar_planilha  # noqa: E402
+
+
+def leitura_atual(conteudo: bytes) -> pd.DataFrame:
+    # Caminho anterior: resposta inteira em memória e todas as colunas
+    return pd.read_excel(io.BytesIO(conteudo))
+
+
+def leitura_seletiva(conteudo: bytes) -> pd.DataFrame:
+    # Caminho do conector: blocos acumulados como no download (_baixar) e apenas as colunas utilizadas
+    bloco = SharePointConnector.TAMANHO_BLOCO
+    blocos = (conteudo[posicao:posicao + bloco] for posicao in range(0, len(conteudo), bloco))
+    baixado, _, _ = _acumular_blocos(blocos, SharePointConnector.LIMITE_MEMORIA)
+    try:
+        return _ler_conteudo(baixado)
+    finally:
+        if isinstance(baixado, str):
+            os.remove(baixado)
+
+
+def _medir_processo(nome: str, caminho: str) -> dict:
+    # Executado em um processo novo, para que o pico de memória seja só desta leitura
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    memoria_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    inicio = time.perf_counter()
+    df = LEITURAS[nome](conteudo)
+    segundos = time.perf_counter() - inicio
+
+    memoria_depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'segundos': segundos,
+        'pico_mb': (memoria_depois - memoria_antes) / 1024,  # ru_maxrss em KB no Linux
+        'colunas': len(df.columns),
+        'memoria_df_mb': df.memory_usage(deep=True).sum() / 1024 ** 2,
+    }
+
+
+def medir(nome: str, caminho: str) -> dict:
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_medir_processo, nome, caminho).result()
+
+
+LEITURAS = {'atual': leitura_atual, 'seletiva': leitura_seletiva}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"Gerando planilha sintética com {args.linhas} linhas...")
+    conteudo = gerar_planilha(args.linhas, colunas_extras=12)
+    print(f"Tamanho do arquivo: {len(conteudo) / 1024 ** 2:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'FOLGA DAS EQUIPES GERAL.xlsx')
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(conteudo)
+
+        for nome in LEITURAS:
+            resultado = medir(nome, caminho)
+            print(f"{nome:>9}: {resultado['segundos']:.2f} s | pico +{resultado['pico_mb']:.1f} MB | "
+                  f"{resultado['colunas']} colunas | DataFrame {resultado['memoria_df_mb']:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
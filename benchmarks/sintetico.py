@@ -0,0 +1,72 @@
+"""Planilhas sintéticas no formato da FOLGA DAS EQUIPES GERAL para os benchmarks.
+
+Cada colaborador tem um supervisor e uma base fixos e uma sequência de folgas;
+uma fração dos intervalos entre folgas fica de propósito abaixo de 30 dias.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from cronograma_core import CIDADES_PARA, INTERVALO_MINIMO_DIAS
+
+FOLGAS_POR_COLABORADOR = 6
+FRACAO_VIOLACOES = 0.05  # Intervalos propositalmente menores que INTERVALO_MINIMO_DIAS
+FRACAO_SEM_PROGRAMACAO = 0.01  # Linhas sem datas (status SEM_PROGRAMAÇÃO)
+
+
+def gerar_folgas(linhas: int, semente: int = 42, data_inicial: str = '2024-01-01') -> pd.DataFrame:
+    """DataFrame com as colunas da planilha original, como lido pelo pd.read_excel"""
+    rng = np.random.default_rng(semente)
+    cidades = np.array(list(CIDADES_PARA))
+
+    # Colaboradores com quantidades variadas de folgas, somando exatamente `linhas`
+    colaboradores = max(1, linhas // FOLGAS_POR_COLABORADOR)
+    pessoa = np.sort(rng.integers(0, colaboradores, linhas))
+    primeira = np.r_[True, pessoa[1:] != pessoa[:-1]]
+
+    # Folgas em sequência: duração de 7 a 20 dias e intervalo de 30 a 90 dias, com violações
+    duracao = rng.integers(7, 21, linhas)
+    intervalo = rng.integers(INTERVALO_MINIMO_DIAS, 91, linhas)
+    violacao = rng.random(linhas) < FRACAO_VIOLACOES
+    intervalo[violacao] = rng.integers(1, INTERVALO_MINIMO_DIAS, violacao.sum())
+
+    # Deslocamento de cada folga = soma (duração + intervalo) das anteriores do mesmo colaborador
+    passo = np.r_[0, (duracao + intervalo)[:-1]]
+    acumulado = np.cumsum(passo)
+    deslocamento = acumulado - np.maximum.accumulate(np.where(primeira, acumulado, 0))
+    inicio_pessoa = rng.integers(0, 60, colaboradores)[pessoa]
+
+    inicio = pd.Timestamp(data_inicial) + pd.to_timedelta(inicio_pessoa + deslocamento, unit='D')
+    termino = inicio + pd.to_timedelta(duracao - 1, unit='D')
+    retorno = termino + pd.to_timedelta(rng.integers(1, 4, linhas), unit='D')
+
+    sem_programacao = rng.random(linhas) < FRACAO_SEM_PROGRAMACAO
+    inicio = inicio.where(~sem_programacao)
+    termino = termino.where(~sem_programacao)
+    retorno = retorno.where(~sem_programacao)
+
+    supervisores = np.array([f"SUPERVISOR {i:02d}" for i in range(max(1, colaboradores // 25))])
+    return pd.DataFrame({
+        'COLABORADOR': np.char.add('COLABORADOR ', np.char.zfill(pessoa.astype(str), 6)),
+        'INICIO': inicio,
+        'TERMINO': termino,
+        'BASE/CAMPO': retorno,
+        'ORIGEM': rng.choice(cidades, colaboradores)[pessoa],
+        'DESTINO': np.where(rng.random(linhas) < 0.8, rng.choice(cidades, colaboradores)[pessoa],
+                            rng.choice(cidades, linhas)),
+        'SUPERVISOR': rng.choice(supervisores, colaboradores)[pessoa],
+        'MÊS': inicio.strftime('%m/%Y'),
+    })
+
+
+def gerar_planilha(linhas: int, colunas_extras: int = 0, semente: int = 42) -> bytes:
+    """Conteúdo .xlsx de gerar_folgas, opcionalmente com colunas extras não utilizadas"""
+    df = gerar_folgas(linhas, semente)
+    rng = np.random.default_rng(semente)
+    for i in range(colunas_extras):
+        df[f'OBSERVAÇÃO {i + 1}'] = rng.choice(['-', 'Voo confirmado', 'Aguardando passagem', 'Reembolso'], linhas)
+
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
@@ -0,0 +1,127 @@
+"""Relatórios de status e auditoria do cronograma de folgas, sem Streamlit.
+
+Exemplos:
+    python cronograma_cli.py "FOLGA NORTE.xlsx" "FOLGA SUL.xlsx" --saida relatorios --formato parquet
+    python cronograma_cli.py --sharepoint --segredos .streamlit/secrets.toml --saida relatorios
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict
+
+import pandas as pd
+
+from cronograma_core import INTERVALO_MINIMO_DIAS, LIMITE_CRITICO_DIAS, CronogramaAnalyzer, ler_planilha_folgas
+
+FORMATOS = ['csv', 'parquet', 'json']
+
+
+def carregar_credenciais(caminho: str = None) -> Dict:
+    """Credenciais do SharePoint a partir do secrets.toml ou das variáveis de ambiente"""
+    if caminho:
+        import tomllib
+
+        with open(caminho, 'rb') as arquivo:
+            return tomllib.load(arquivo)['sharepoint']
+
+    return {
+        'client_id': os.environ['SHAREPOINT_CLIENT_ID'],
+        'client_secret': os.environ['SHAREPOINT_CLIENT_SECRET'],
+        'tenant_id': os.environ['SHAREPOINT_TENANT_ID'],
+        'token_cache_path': os.environ.get('SHAREPOINT_TOKEN_CACHE'),
+        'arquivos': os.environ['SHAREPOINT_ARQUIVOS'].split(';') if os.environ.get('SHAREPOINT_ARQUIVOS') else None,
+        'pasta': os.environ.get('SHAREPOINT_PASTA'),
+    }
+
+
+def carregar_sharepoint(caminho_segredos: str = None) -> pd.DataFrame:
+    # Importado sob demanda: requests/msal só são necessários neste caminho
+    from cronograma_sharepoint import SharePointConnector
+
+    credenciais = carregar_credenciais(caminho_segredos)
+    connector = SharePointConnector(
+        credenciais['client_id'],
+        credenciais['client_secret'],
+        credenciais['tenant_id'],
+        token_cache_path=credenciais.get('token_cache_path'),
+        arquivos=credenciais.get('arquivos'),
+        pasta=credenciais.get('pasta'),
+    )
+    df, _ = connector.get_data()
+    if df is None:
+        raise RuntimeError(f"Não foi possível carregar a planilha do SharePoint: {connector.erro}")
+    return df
+
+
+def gerar_relatorios(analyzer: CronogramaAnalyzer, data_referencia, intervalo_minimo: int,
+                     limite_critico: int) -> Dict[str, pd.DataFrame]:
+    """Tabelas de status, auditoria, validação e cidades sem coordenadas"""
+    return {
+        'status': analyzer.get_status_atual(data_referencia),
+        'auditoria': analyzer.audit_folgas(intervalo_minimo, limite_critico),
+        'validacao': analyzer.validar_folgas(),
+        'cidades_nao_encontradas': analyzer.cidades_nao_encontradas,
+    }
+
+
+def salvar(tabela: pd.DataFrame, caminho_base: str, formato: str) -> str:
+    caminho = f"{caminho_base}.{formato}"
+    if formato == 'csv':
+        tabela.to_csv(caminho, index=False)
+    elif formato == 'parquet':
+        tabela.to_parquet(caminho, index=False)
+    else:
+        tabela.to_json(caminho, orient='records', date_format='iso', force_ascii=False)
+    return caminho
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Gera relatórios do cronograma de folgas sem iniciar o Streamlit.")
+    parser.add_argument('planilhas', nargs='*', help="Arquivos .xlsx no formato da FOLGA DAS EQUIPES GERAL")
+    parser.add_argument('--sharepoint', action='store_true', help="Baixa a planilha do SharePoint")
+    parser.add_argument('--segredos', help="secrets.toml com a seção [sharepoint] (padrão: variáveis de ambiente)")
+    parser.add_argument('--saida', default='relatorios', help="Diretório dos relatórios (padrão: relatorios)")
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--data-referencia', type=lambda texto: datetime.strptime(texto, '%Y-%m-%d').date(),
+                        default=datetime.now().date(), help="Data no formato AAAA-MM-DD (padrão: hoje)")
+    parser.add_argument('--intervalo-minimo', type=int, default=INTERVALO_MINIMO_DIAS)
+    parser.add_argument('--limite-critico', type=int, default=LIMITE_CRITICO_DIAS)
+    parser.add_argument('--memoria', action='store_true', help="Mostra os bytes por coluna antes e depois da compactação")
+    args = parser.parse_args(argv)
+
+    if not args.planilhas and not args.sharepoint:
+        parser.error("informe ao menos uma planilha ou --sharepoint")
+
+    fontes = [(os.path.splitext(os.path.basename(caminho))[0], caminho) for caminho in args.planilhas]
+    if args.sharepoint:
+        fontes.append(('sharepoint', None))
+
+    os.makedirs(args.saida, exist_ok=True)
+    falhas = 0
+
+    for nome, caminho in fontes:
+        inicio = time.perf_counter()
+        try:
+            df = carregar_sharepoint(args.segredos) if caminho is None else ler_planilha_folgas(caminho)
+            analyzer = CronogramaAnalyzer(df)
+            relatorios = gerar_relatorios(analyzer, args.data_referencia, args.intervalo_minimo, args.limite_critico)
+            for relatorio, tabela in relatorios.items():
+                salvar(tabela, os.path.join(args.saida, f"{nome}_{relatorio}"), args.formato)
+        except Exception as e:
+            falhas += 1
+            print(f"[ERRO] {nome}: {e}", file=sys.stderr)
+            continue
+
+        auditoria = relatorios['auditoria']
+        print(f"[OK] {nome}: {len(analyzer.df)} linhas, {len(auditoria)} problema(s) de intervalo "
+              f"({int(auditoria['critico'].sum())} crítico(s)) em {time.perf_counter() - inicio:.2f} s")
+        if args.memoria:
+            print(analyzer.relatorio_memoria().to_string())
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1265 @@
+"""Processamento do cronograma de folgas, sem dependências de interface (Streamlit, mapas, gráficos)."""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import os
+import threading
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from cronograma_exportacao import exportar as exportar_tabela
+from cronograma_metricas import METRICAS
+
+# Coordenadas das principais cidades do Pará
+CIDADES_PARA = {
+    'Belém': {'lat': -1.4558, 'lon': -48.4902},
+    'Ananindeua': {'lat': -1.3656, 'lon': -48.3739},
+    'Santarém': {'lat': -2.4426, 'lon': -54.7085},
+    'Marabá': {'lat': -5.3686, 'lon': -49.1178},
+    'Parauapebas': {'lat': -6.0675, 'lon': -49.9024},
+    'Castanhal': {'lat': -1.2939, 'lon': -47.9261},
+    'Abaetetuba': {'lat': -1.7218, 'lon': -48.8788},
+    'Canaã dos Carajás': {'lat': -6.4969, 'lon': -49.8771},
+    'Marituba': {'lat': -1.3473, 'lon': -48.3439},
+    'Barcarena': {'lat': -1.6155, 'lon': -48.6289},
+    'Altamira': {'lat': -3.2039, 'lon': -52.2094},
+    'Paragominas': {'lat': -2.9977, 'lon': -47.3548},
+    'Tucuruí': {'lat': -3.7661, 'lon': -49.6725},
+    'Bragança': {'lat': -1.0534, 'lon': -46.7655},
+    'Itaituba': {'lat': -4.2761, 'lon': -55.9836},
+    'Oriximiná': {'lat': -1.7653, 'lon': -55.8661},
+    'Redenção': {'lat': -8.0273, 'lon': -50.0305},
+    'Capanema': {'lat': -1.1944, 'lon': -47.1808},
+    'Conceição do Araguaia': {'lat': -8.2578, 'lon': -49.2644},
+    'Tailândia': {'lat': -2.9496, 'lon': -48.3458},
+    'Juruti': {'lat': -2.1440, 'lon': -56.0891},
+    'Vila Gorete': {'lat': -2.4256, 'lon': -55.2365},
+    'Mojui dos Campos': {'lat': -2.6824, 'lon': -54.6418},
+    'Menbeca': {'lat': -2.2196, 'lon': -54.9899},
+    'Barreiras': {'lat': -4.0902, 'lon': -55.6892},
+    'Almeirim': {'lat': -1.5276090427351592, 'lon': -52.577482130144006},
+    'Rurópolis': {'lat': -4.094116299218916, 'lon': -54.91062274171425}
+}
+
+
+def normalizar_cidade(cidade) -> str:
+    """Normaliza nome de cidade para busca (sem acentos, caixa e espaços extras)"""
+    texto = unicodedata.normalize('NFKD', str(cidade))
+    texto = texto.encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(texto.casefold().split())
+
+
+# Tabela de busca de coordenadas indexada pelo nome normalizado
+CIDADES_LOOKUP = pd.DataFrame(
+    [(normalizar_cidade(nome), nome, coords['lat'], coords['lon']) for nome, coords in CIDADES_PARA.items()],
+    columns=['chave', 'nome', 'lat', 'lon']
+).set_index('chave')
+
+# Classificação das folgas: (status, cor, prioridade), na ordem de avaliação.
+# O último item é o padrão para folgas com mais de 30 dias de antecedência.
+STATUS_FOLGA = [
+    ("SEM_PROGRAMAÇÃO", "⚫", 6),
+    ("EM_FOLGA", "🟢", 2),
+    ("URGENTE", "🔴", 1),
+    ("ATENÇÃO", "🟡", 3),
+    ("PROGRAMADO", "🟢", 4),
+    ("DISTANTE", "🔵", 5),
+]
+# Folgas já encerradas: fora do cronograma, mas contadas nos relatórios
+STATUS_CONCLUIDA = "CONCLUÍDA"
+
+# Inconsistências da validação da planilha: (tipo, ícone, descrição), na ordem de exibição
+TIPOS_INCONSISTENCIA = [
+    ("SOBREPOSICAO", "🔀", "Folgas do mesmo colaborador que se sobrepõem"),
+    ("DUPLICADA", "📑", "Mesma folga lançada mais de uma vez"),
+    ("PERIODO_INVERTIDO", "🔁", "Término antes do início"),
+    ("RETORNO_ANTES_TERMINO", "↩️", "Retorno à base/campo antes do término da folga"),
+    ("DATAS_INCOMPLETAS", "❓", "Início ou término não preenchido"),
+    ("SEM_RETORNO", "📭", "Folga sem data de retorno à base/campo"),
+]
+
+# Colunas da planilha utilizadas pelo sistema e seus nomes padronizados
+COLUNAS_PLANILHA = {
+    'COLABORADOR': 'colaborador',
+    'INICIO': 'inicio',
+    'TERMINO': 'termino',
+    'BASE/CAMPO': 'base_campo',
+    'ORIGEM': 'origem',
+    'DESTINO': 'destino',
+    'SUPERVISOR': 'supervisor',
+    'MÊS': 'mes'
+}
+
+# Colunas de texto repetitivo guardadas como category (um código por linha + dicionário de valores)
+COLUNAS_CATEGORICAS = ['colaborador', 'supervisor', 'origem', 'destino', 'mes', 'regiao']
+
+# Tabelas derivadas guardadas por tipo (datas e parâmetros variam a cada interação; as mais antigas saem)
+TABELAS_POR_TIPO = 4
+
+# Snapshot local dos dados processados (inicialização rápida e modo offline)
+SNAPSHOT_PATH = os.environ.get("CRONOGRAMA_SNAPSHOT", os.path.join(".cache", "cronograma.parquet"))
+
+# Regra de auditoria: intervalo mínimo entre folgas e limite para casos críticos
+INTERVALO_MINIMO_DIAS = 30
+LIMITE_CRITICO_DIAS = 15
+
+# Cobertura das bases: horizonte da linha do tempo e efetivo mínimo em serviço
+HORIZONTE_COBERTURA_DIAS = 90
+EFETIVO_MINIMO_PADRAO = 1
+
+# Cubo dos relatórios: dimensões e medidas somáveis de cada célula
+DIMENSOES_CUBO = ['supervisor', 'origem', 'destino', 'mes', 'status']
+MEDIDAS_CUBO = ['folgas', 'dias_folga']
+
+# Tabelas disponíveis para exportação: visão -> descrição
+VISOES_EXPORTACAO = {
+    'cronograma': "Cronograma filtrado",
+    'auditoria': "Auditoria de intervalos",
+    'validacao': "Consistência da planilha",
+}
+
+
+def _datas_em_dias(df: pd.DataFrame, coluna: str) -> np.ndarray:
+    """Coluna de datas como datetime64[D]; NaT em todas as linhas se a coluna não existir"""
+    if coluna not in df.columns:
+        return np.full(len(df), np.datetime64('NaT'), dtype='datetime64[D]')
+    return df[coluna].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+
+
+def ler_planilha_folgas(arquivo) -> pd.DataFrame:
+    """Lê apenas as colunas utilizadas da primeira aba da planilha de folgas"""
+    tipos = {coluna: str for coluna in ['COLABORADOR', 'ORIGEM', 'DESTINO', 'SUPERVISOR']}
+    df = pd.read_excel(arquivo, engine='openpyxl', usecols=lambda nome: nome in COLUNAS_PLANILHA, dtype=tipos)
+
+    if len(df.columns) < len(COLUNAS_PLANILHA):
+        # Cabeçalho fora do padrão: ler a aba inteira e deixar process_data usar as posições
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+        df = pd.read_excel(arquivo, engine='openpyxl')
+
+    # Linha de cada registro na própria planilha (cabeçalho na linha 1), mantida após dropna, concat e snapshot
+    df['linha_planilha'] = np.arange(2, len(df) + 2, dtype=np.int32)
+    return df
+
+
+class IndiceFolgas:
+    """Índice de intervalos (inicio, termino) por extremos ordenados.
+
+    As folgas são ordenadas pelo início; como nenhuma folga dura mais que
+    ``duracao_maxima``, as que cobrem uma data D estão entre os inícios em
+    [D - duracao_maxima, D], localizados por busca binária. Contagens usam
+    apenas os dois vetores de extremos ordenados.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        folgas = df.dropna(subset=['inicio', 'termino'])
+        folgas = folgas[folgas['termino'] >= folgas['inicio']]  # Ignora períodos invertidos
+        inicio = _datas_em_dias(folgas, 'inicio')
+        termino = _datas_em_dias(folgas, 'termino')
+
+        ordem = np.argsort(inicio, kind='stable')
+        self.df = folgas.iloc[ordem]
+        self.inicio = inicio[ordem]
+        self.termino = termino[ordem]
+        self.terminos_ordenados = np.sort(termino)
+        duracoes = self.termino - self.inicio
+        self.duracao_maxima = duracoes.max() if len(duracoes) else np.timedelta64(0, 'D')
+
+    def _posicoes_entre(self, data_inicial, data_final) -> np.ndarray:
+        d1 = np.datetime64(data_inicial, 'D')
+        d2 = np.datetime64(data_final, 'D')
+        primeiro = np.searchsorted(self.inicio, d1 - self.duracao_maxima, side='left')
+        ultimo = np.searchsorted(self.inicio, d2, side='right')
+        candidatas = np.arange(primeiro, ultimo)
+        return candidatas[self.termino[primeiro:ultimo] >= d1]
+
+    def contar_em_folga(self, data) -> int:
+        """Quantidade de folgas ativas na data (início <= data <= término)"""
+        d = np.datetime64(data, 'D')
+        iniciadas = np.searchsorted(self.inicio, d, side='right')
+        encerradas = np.searchsorted(self.terminos_ordenados, d, side='left')
+        return int(iniciadas - encerradas)
+
+    def em_folga_em(self, data) -> pd.DataFrame:
+        """Folgas ativas na data informada"""
+        return self.em_folga_entre(data, data)
+
+    def em_folga_entre(self, data_inicial, data_final) -> pd.DataFrame:
+        """Folgas que têm ao menos um dia dentro do período [data_inicial, data_final]"""
+        return self.df.iloc[self._posicoes_entre(data_inicial, data_final)]
+
+    def sobrepostas_a(self, colaborador) -> pd.DataFrame:
+        """Folgas de outros colaboradores que coincidem com alguma folga do colaborador"""
+        proprias = np.flatnonzero(self.df['colaborador'].to_numpy() == colaborador)
+        if len(proprias) == 0:
+            return self.df.iloc[:0]
+
+        posicoes = np.unique(np.concatenate([
+            self._posicoes_entre(self.inicio[i], self.termino[i]) for i in proprias
+        ]))
+        sobrepostas = self.df.iloc[posicoes]
+        return sobrepostas[sobrepostas['colaborador'] != colaborador]
+
+
+class IndiceEquipes:
+    """Posições das linhas por supervisor e por colaborador, para filtrar sem varrer a tabela"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.por_supervisor = df.groupby('supervisor', observed=True).indices
+        self.por_colaborador = df.groupby('colaborador', observed=True).indices
+        self.supervisores = sorted(self.por_supervisor, key=str)
+        self.todos_colaboradores = sorted(self.por_colaborador, key=str)
+
+        # Colaboradores de cada supervisor, para os filtros em cascata
+        pares = df[['supervisor', 'colaborador']].dropna().drop_duplicates()
+        self.colaboradores_por_supervisor = {
+            supervisor: sorted(grupo.tolist(), key=str)
+            for supervisor, grupo in pares.groupby('supervisor', observed=True)['colaborador']
+        }
+
+    def colaboradores(self, supervisor=None) -> List:
+        """Colaboradores do supervisor informado (todos quando None)"""
+        if supervisor is None:
+            return self.todos_colaboradores
+        return self.colaboradores_por_supervisor.get(supervisor, [])
+
+    def posicoes(self, supervisor=None, colaborador=None):
+        """Posições (iloc) ordenadas das linhas do filtro, ou None quando não há filtro"""
+        vazio = np.zeros(0, dtype=np.intp)
+        grupos = []
+        if supervisor is not None:
+            grupos.append(self.por_supervisor.get(supervisor, vazio))
+        if colaborador is not None:
+            grupos.append(self.por_colaborador.get(colaborador, vazio))
+        if not grupos:
+            return None
+        if len(grupos) == 1:
+            return grupos[0]
+        return np.intersect1d(grupos[0], grupos[1], assume_unique=True)
+
+
+class CronogramaAnalyzer:
+    def __init__(self, df: pd.DataFrame):
+        with METRICAS.medir('CronogramaAnalyzer.__init__', linhas_entrada=len(df)) as registro:
+            self.df = df.copy(deep=False)  # Os dados de entrada não são alterados nem duplicados
+            self._tabelas = {}
+            self._tabelas_lock = threading.Lock()
+            self._exportacoes = {}
+            self.process_data()
+            registro['linhas'] = len(self.df)
+
+    @classmethod
+    def from_processed(cls, df: pd.DataFrame) -> 'CronogramaAnalyzer':
+        """Cria o analisador a partir de dados já processados (ex.: snapshot local)"""
+        analyzer = cls.__new__(cls)
+        analyzer.df = df
+        analyzer._tabelas = {}
+        analyzer._tabelas_lock = threading.Lock()
+        analyzer._exportacoes = {}
+        analyzer.cidades_nao_encontradas = analyzer._cidades_sem_coordenadas()
+        return analyzer
+
+    def process_data(self):
+        """Processa e limpa os dados"""
+        self._tabelas.clear()
+        self._exportacoes.clear()
+
+        # Renomear colunas para padrão
+        column_mapping = COLUNAS_PLANILHA
+
+        # Usar os nomes atuais das colunas se existirem
+        available_columns = self.df.columns.tolist()
+        for old_name, new_name in column_mapping.items():
+            if old_name in available_columns:
+                self.df.rename(columns={old_name: new_name}, inplace=True)
+            elif len(available_columns) >= len(column_mapping):
+                # Se não encontrar pelo nome, usa a posição
+                idx = list(column_mapping.keys()).index(old_name)
+                if idx < len(available_columns):
+                    self.df.rename(columns={available_columns[idx]: new_name}, inplace=True)
+
+        # Converter datas
+        date_columns = ['inicio', 'termino', 'base_campo']
+        for col in date_columns:
+            if col in self.df.columns:
+                self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
+
+        # Dados que não vieram de ler_planilha_folgas: linha pela posição original
+        if 'linha_planilha' not in self.df.columns:
+            self.df['linha_planilha'] = np.arange(2, len(self.df) + 2, dtype=np.int32)
+
+        # Limpar dados vazios
+        self.df = self.df.dropna(subset=['colaborador'])
+
+        # Representação compacta: textos repetidos como category
+        self.df = self.df.astype({
+            coluna: 'category' for coluna in COLUNAS_CATEGORICAS if coluna in self.df.columns
+        })
+
+        # Adicionar coordenadas
+        self.add_coordinates()
+
+    def add_coordinates(self):
+        """Adiciona coordenadas das cidades"""
+        for coluna in ['origem', 'destino']:
+            if coluna not in self.df.columns:
+                continue
+
+            # Busca feita apenas sobre os valores distintos da coluna
+            codigos, cidades = pd.factorize(self.df[coluna])
+            chaves = pd.Index(cidades.map(normalizar_cidade))
+            posicoes = CIDADES_LOOKUP.index.get_indexer(chaves)
+
+            encontrada = posicoes >= 0
+            lat = np.where(encontrada, CIDADES_LOOKUP['lat'].to_numpy()[posicoes], np.nan)
+            lon = np.where(encontrada, CIDADES_LOOKUP['lon'].to_numpy()[posicoes], np.nan)
+
+            # Código -1 (valor vazio) aponta para o NaN adicionado ao final
+            lat = np.append(lat, np.nan)
+            lon = np.append(lon, np.nan)
+            self.df[f'{coluna}_lat'] = lat[codigos].astype(np.float32)
+            self.df[f'{coluna}_lon'] = lon[codigos].astype(np.float32)
+
+        self.cidades_nao_encontradas = self._cidades_sem_coordenadas()
+
+    def _cidades_sem_coordenadas(self) -> pd.DataFrame:
+        """Lista as cidades preenchidas na planilha que não possuem coordenadas"""
+        nao_encontradas = []
+
+        for coluna in ['origem', 'destino']:
+            if f'{coluna}_lat' not in self.df.columns:
+                continue
+
+            cidades = self.df[coluna]
+            preenchida = cidades.notna() & (cidades.astype(str).str.strip() != '')
+            ocorrencias = cidades[preenchida & self.df[f'{coluna}_lat'].isna()].value_counts(sort=False)
+            ocorrencias = ocorrencias[ocorrencias > 0]  # Colunas category listam também valores ausentes
+            if not ocorrencias.empty:
+                nao_encontradas.append(pd.DataFrame({
+                    'coluna': coluna,
+                    'cidade': ocorrencias.index.astype(object),
+                    'ocorrencias': ocorrencias.to_numpy()
+                }))
+
+        # Cidades sem coordenadas, para correção da planilha
+        if nao_encontradas:
+            return pd.concat(nao_encontradas, ignore_index=True)
+        return pd.DataFrame(columns=['coluna', 'cidade', 'ocorrencias'])
+
+    def relatorio_memoria(self) -> pd.DataFrame:
+        """Bytes por coluna antes (textos como object, coordenadas float64) e depois da compactação"""
+        tipos_originais = {}
+        for coluna, tipo in self.df.dtypes.items():
+            if isinstance(tipo, pd.CategoricalDtype):
+                tipos_originais[coluna] = object
+            elif tipo == np.float32:
+                tipos_originais[coluna] = np.float64
+        original = self.df.astype(tipos_originais)
+
+        relatorio = pd.DataFrame({
+            'tipo_antes': original.dtypes.astype(str),
+            'tipo_depois': self.df.dtypes.astype(str),
+            'bytes_antes': original.memory_usage(deep=True, index=False),
+            'bytes_depois': self.df.memory_usage(deep=True, index=False),
+        })
+        relatorio.loc['TOTAL'] = ['', '', relatorio['bytes_antes'].sum(), relatorio['bytes_depois'].sum()]
+        relatorio['reducao_pct'] = (
+            100 * (1 - relatorio['bytes_depois'] / relatorio['bytes_antes'].where(relatorio['bytes_antes'] > 0))
+        ).round(1)
+        return relatorio
+
+    def format_date_br(self, date_value):
+        """Formatar data para padrão brasileiro (dd/mm/aaaa)"""
+        if pd.isna(date_value):
+            return 'N/A'
+
+        if hasattr(date_value, 'strftime'):
+            return date_value.strftime("%d/%m/%Y")
+
+        return str(date_value)
+
+    def _tabela_em_cache(self, chave, calcular):
+        """Retorna uma tabela derivada, calculada uma única vez por versão dos dados.
+
+        Guarda as TABELAS_POR_TIPO usadas mais recentemente de cada tipo (chave[0]).
+        """
+        with self._tabelas_lock:
+            tabela = self._tabelas.pop(chave, None)
+            if tabela is not None:
+                # Reinserida no fim: a ordem do dict é a ordem de uso
+                self._tabelas[chave] = tabela
+        if tabela is not None:
+            METRICAS.contar(f"cache.hit.{chave[0]}")
+            return tabela
+
+        METRICAS.contar(f"cache.miss.{chave[0]}")
+        with METRICAS.medir(f"calcular.{chave[0]}", linhas=len(self.df)):
+            tabela = calcular()
+        with self._tabelas_lock:
+            mesmo_tipo = [k for k in self._tabelas if k[0] == chave[0] and k != chave]
+            for antiga in mesmo_tipo[:max(0, len(mesmo_tipo) - TABELAS_POR_TIPO + 1)]:
+                del self._tabelas[antiga]
+            self._tabelas[chave] = tabela
+        return tabela
+
+    @property
+    def indice_folgas(self) -> IndiceFolgas:
+        """Índice de intervalos das folgas, construído sob demanda"""
+        return self._tabela_em_cache(('indice',), lambda: IndiceFolgas(self.df))
+
+    @property
+    def regioes(self) -> List[str]:
+        """Regiões (planilhas de origem) presentes nos dados"""
+        if 'regiao' not in self.df.columns:
+            return []
+        return sorted(self.df['regiao'].dropna().astype(str).unique())
+
+    def da_regiao(self, regiao: str) -> 'CronogramaAnalyzer':
+        """Analisador restrito a uma região, criado uma única vez por versão dos dados"""
+        def calcular():
+            df = self.df[self.df['regiao'].astype(str) == regiao]
+            # Dicionários das colunas category reduzidos aos valores da região
+            df = df.assign(**{coluna: df[coluna].cat.remove_unused_categories()
+                              for coluna in df.select_dtypes('category').columns})
+            analyzer = CronogramaAnalyzer.from_processed(df)
+            analyzer.construido_em = getattr(self, 'construido_em', None)
+            return analyzer
+
+        return self._tabela_em_cache(('regiao', regiao), calcular)
+
+    @property
+    def indice_equipes(self) -> IndiceEquipes:
+        """Índice supervisor/colaborador → linhas, construído sob demanda"""
+        return self._tabela_em_cache(('equipes',), lambda: IndiceEquipes(self.df))
+
+    def get_status_atual(self, hoje=None) -> pd.DataFrame:
+        """Classifica as folgas por proximidade, ordenadas por urgência"""
+        if hoje is None:
+            hoje = datetime.now().date()
+        return self._tabela_em_cache(('status', hoje), lambda: self._classificar_status(hoje))
+
+    def _classificar_status(self, hoje) -> pd.DataFrame:
+        referencia = np.datetime64(hoje, 'D')
+        n = len(self.df)
+
+        def coluna_texto(nome):
+            if nome not in self.df.columns:
+                return np.full(n, 'N/A', dtype=object)
+            return self.df[nome].to_numpy(dtype=object)
+
+        inicio = _datas_em_dias(self.df, 'inicio')
+        termino = _datas_em_dias(self.df, 'termino')
+
+        programada = ~np.isnat(inicio) & ~np.isnat(termino)
+        dias = (inicio - referencia) / np.timedelta64(1, 'D')
+        duracao = (termino - inicio) / np.timedelta64(1, 'D') + 1
+
+        # Folgas já encerradas (termino < hoje) não entram no cronograma
+        manter = ~programada | (termino >= referencia)
+
+        condicoes = [
+            ~programada,
+            dias <= 0,
+            dias <= 7,
+            dias <= 15,
+            dias <= 30,
+        ]
+        buckets = STATUS_FOLGA[:-1]
+        padrao = STATUS_FOLGA[-1]
+        status = np.select(condicoes, [b[0] for b in buckets], default=padrao[0])
+        status_cor = np.select(condicoes, [b[1] for b in buckets], default=padrao[1])
+        prioridade = np.select(condicoes, [b[2] for b in buckets], default=padrao[2])
+
+        dias_para_folga = np.where(programada, np.maximum(np.nan_to_num(dias), 0), 999).astype(int)
+        duracao = np.where(programada, np.nan_to_num(duracao), 0).astype(int)
+        destino = np.where(programada, coluna_texto('destino'), 'N/A')
+
+        tabela = pd.DataFrame({
+            'colaborador': coluna_texto('colaborador'),
+            'supervisor': coluna_texto('supervisor'),
+            'destino': destino,
+            'origem': coluna_texto('origem'),
+            'inicio': pd.to_datetime(inicio),
+            'termino': pd.to_datetime(termino),
+            'dias_para_folga': dias_para_folga,
+            'duracao': duracao,
+            'status': status,
+            'status_cor': status_cor,
+            'prioridade': prioridade.astype(int),
+        }, index=self.df.index)[manter]
+
+        # Ordenar por prioridade (urgência) e depois por dias para folga
+        return tabela.sort_values(['prioridade', 'dias_para_folga'], kind='stable')
+
+    def status_por_linha(self, hoje=None) -> pd.Series:
+        """Status de cada linha dos dados na data; folgas já encerradas ficam como concluídas"""
+        return self.get_status_atual(hoje)['status'].reindex(self.df.index).fillna(STATUS_CONCLUIDA)
+
+    def efetivo_por_base(self) -> pd.Series:
+        """Quantidade de colaboradores distintos por base de origem"""
+        return self._tabela_em_cache(
+            ('efetivo',), lambda: self.df.groupby('origem', sort=True, observed=True)['colaborador'].nunique()
+        )
+
+    def minimos_por_base(self, minimos: Dict[str, int] = None,
+                         efetivo_minimo: int = EFETIVO_MINIMO_PADRAO) -> pd.Series:
+        """Efetivo mínimo em serviço de cada base: exceções configuradas ou o mínimo padrão"""
+        bases = self.efetivo_por_base().index
+        return pd.Series(bases.astype(object), index=bases).map(minimos or {}).fillna(efetivo_minimo).astype(int)
+
+    def cobertura_por_base(self, data_inicial=None, dias: int = HORIZONTE_COBERTURA_DIAS) -> pd.DataFrame:
+        """Ausentes por base (linhas) e dia (colunas) a partir de data_inicial"""
+        if data_inicial is None:
+            data_inicial = datetime.now().date()
+        return self._tabela_em_cache(
+            ('cobertura', data_inicial, dias), lambda: self._varrer_ausencias(data_inicial, dias)
+        )
+
+    def _varrer_ausencias(self, data_inicial, dias: int) -> pd.DataFrame:
+        eixo = np.arange(np.datetime64(data_inicial, 'D'), np.datetime64(data_inicial, 'D') + dias)
+        bases = self.efetivo_por_base().index
+
+        folgas = self.df.dropna(subset=['inicio', 'termino', 'origem'])
+        inicio = _datas_em_dias(folgas, 'inicio')
+        termino = _datas_em_dias(folgas, 'termino')
+
+        # Posição de cada folga no eixo de datas, recortada ao horizonte
+        entrada = np.maximum((inicio - eixo[0]).astype(int), 0)
+        saida = np.minimum((termino - eixo[0]).astype(int), dias - 1) + 1
+        dentro = entrada < saida
+        base = bases.get_indexer(folgas['origem'])[dentro]
+
+        # Linha de varredura: +1 no início, -1 no dia seguinte ao término, soma acumulada
+        eventos = np.zeros((len(bases), dias + 1), dtype=np.int32)
+        np.add.at(eventos, (base, entrada[dentro]), 1)
+        np.add.at(eventos, (base, saida[dentro]), -1)
+        ausentes = np.cumsum(eventos[:, :dias], axis=1)
+
+        return pd.DataFrame(ausentes, index=bases, columns=pd.DatetimeIndex(eixo))
+
+    def propor_ajustes(self, data_referencia=None, intervalo_minimo: int = INTERVALO_MINIMO_DIAS,
+                       efetivo_minimo: int = EFETIVO_MINIMO_PADRAO,
+                       minimos: Dict[str, int] = None) -> Tuple[pd.DataFrame, Dict]:
+        """Propõe novas datas para as folgas futuras, retornando (proposta, resumo)"""
+        if data_referencia is None:
+            data_referencia = datetime.now().date()
+        minimos = dict(minimos or {})
+
+        def calcular():
+            otimizador = OtimizadorFolgas(self, data_referencia, intervalo_minimo, efetivo_minimo, minimos=minimos)
+            return otimizador.otimizar(), otimizador.resumo
+
+        chave = ('ajustes', data_referencia, intervalo_minimo, efetivo_minimo, tuple(sorted(minimos.items())))
+        return self._tabela_em_cache(chave, calcular)
+
+    def verificar_efetivo(self, data_referencia=None, minimos: Dict[str, int] = None,
+                          efetivo_minimo: int = EFETIVO_MINIMO_PADRAO) -> pd.DataFrame:
+        """Efetivo em serviço na base de origem durante cada folga futura (ver VerificadorEfetivo)"""
+        if data_referencia is None:
+            data_referencia = datetime.now().date()
+        minimos = dict(minimos or {})
+
+        def calcular():
+            return VerificadorEfetivo(self, minimos, efetivo_minimo).verificar(data_referencia)
+
+        chave = ('efetivo_minimo', data_referencia, tuple(sorted(minimos.items())), efetivo_minimo)
+        return self._tabela_em_cache(chave, calcular)
+
+    def cubo_folgas(self, data_referencia=None) -> 'CuboFolgas':
+        """Agregados por supervisor × origem × destino × mês × status, um cubo por versão dos dados e data"""
+        if data_referencia is None:
+            data_referencia = datetime.now().date()
+        return self._tabela_em_cache(('cubo', data_referencia), lambda: CuboFolgas(self, data_referencia))
+
+    def tabela_exportacao(self, visao: str, data_referencia=None, filtros: Dict[str, List] = None) -> pd.DataFrame:
+        """Linhas da visão exportada; o cronograma aceita filtros por coluna (supervisor, origem, status...)"""
+        if visao == 'auditoria':
+            return self.audit_folgas()
+        if visao == 'validacao':
+            return self.validar_folgas()
+        if visao != 'cronograma':
+            raise ValueError(f"Visão de exportação desconhecida: {visao}")
+
+        colunas = [coluna for coluna in [*COLUNAS_PLANILHA.values(), 'regiao'] if coluna in self.df.columns]
+        tabela = self.df[colunas].assign(status=self.status_por_linha(data_referencia))
+        for coluna, valores in (filtros or {}).items():
+            if valores:
+                tabela = tabela[tabela[coluna].isin(list(valores))]
+        return tabela
+
+    @staticmethod
+    def _selecao_exportacao(visao: str, data_referencia, filtros: Dict[str, List] = None) -> Tuple:
+        """Data e filtros que definem o conteúdo exportado; auditoria e validação não dependem deles"""
+        if visao != 'cronograma':
+            return None, ()
+        if data_referencia is None:
+            data_referencia = datetime.now().date()
+        return data_referencia, tuple(sorted(
+            (coluna, tuple(sorted(map(str, valores)))) for coluna, valores in (filtros or {}).items() if valores
+        ))
+
+    def exportacao_pronta(self, visao: str, formato: str, data_referencia=None,
+                          filtros: Dict[str, List] = None) -> Optional[bytes]:
+        """Arquivo já gerado para a visão, formato, data e filtros; None se ainda não foi pedido"""
+        guardado = self._exportacoes.get((visao, formato))
+        if guardado is not None and guardado[0] == self._selecao_exportacao(visao, data_referencia, filtros):
+            return guardado[1]
+        return None
+
+    def exportar(self, visao: str, formato: str, data_referencia=None, filtros: Dict[str, List] = None) -> bytes:
+        """Arquivo da visão (csv, parquet ou xlsx); guarda apenas o último gerado por visão e formato"""
+        conteudo = self.exportacao_pronta(visao, formato, data_referencia, filtros)
+        if conteudo is not None:
+            METRICAS.contar("cache.hit.exportacao")
+            return conteudo
+
+        METRICAS.contar("cache.miss.exportacao")
+        selecao = self._selecao_exportacao(visao, data_referencia, filtros)
+        with METRICAS.medir("calcular.exportacao", linhas=len(self.df)):
+            conteudo = exportar_tabela(self.tabela_exportacao(visao, data_referencia, filtros), formato, aba=visao)
+        self._exportacoes[(visao, formato)] = (selecao, conteudo)
+        return conteudo
+
+    def validar_folgas(self) -> pd.DataFrame:
+        """Inconsistências das linhas da planilha, uma por linha afetada (ver TIPOS_INCONSISTENCIA)"""
+        return self._tabela_em_cache(('validacao',), self._validar)
+
+    def _validar(self) -> pd.DataFrame:
+        n = len(self.df)
+
+        inicio = _datas_em_dias(self.df, 'inicio')
+        termino = _datas_em_dias(self.df, 'termino')
+        retorno = _datas_em_dias(self.df, 'base_campo')
+        tem_inicio, tem_termino = ~np.isnat(inicio), ~np.isnat(termino)
+        invertido = tem_inicio & tem_termino & (termino < inicio)
+        valido = tem_inicio & tem_termino & ~invertido
+
+        marcadas = {
+            'PERIODO_INVERTIDO': invertido,
+            'DATAS_INCOMPLETAS': tem_inicio ^ tem_termino,
+            'SEM_RETORNO': valido & np.isnat(retorno) if 'base_campo' in self.df.columns else np.zeros(n, bool),
+            'RETORNO_ANTES_TERMINO': valido & ~np.isnat(retorno) & (retorno < termino),
+        }
+
+        # Períodos válidos ordenados por (colaborador, início, término): duplicatas ficam adjacentes
+        posicoes = np.flatnonzero(valido)
+        codigos = pd.factorize(self.df['colaborador'])[0][posicoes]
+        ini = inicio[posicoes].astype(np.int64)
+        ter = termino[posicoes].astype(np.int64)
+        ordem = np.lexsort((ter, ini, codigos))
+        posicoes, codigos, ini, ter = posicoes[ordem], codigos[ordem], ini[ordem], ter[ordem]
+
+        mesmo_colaborador = np.zeros(len(posicoes), dtype=bool)
+        mesmo_colaborador[1:] = codigos[1:] == codigos[:-1]
+        duplicada = mesmo_colaborador.copy()
+        duplicada[1:] &= (ini[1:] == ini[:-1]) & (ter[1:] == ter[:-1])
+
+        # Maior término anterior do mesmo colaborador: máximo acumulado de término + deslocamento por
+        # colaborador (grupos em ordem crescente de código, então o máximo nunca vem de outro grupo)
+        base = ter.min() if len(ter) else 0
+        deslocamento = codigos.astype(np.int64) * ((ter.max() - base + 1) if len(ter) else 1)
+        chave = ter - base + deslocamento
+        maximo = np.maximum.accumulate(chave)
+        dono = np.maximum.accumulate(np.where(chave == maximo, np.arange(len(chave)), 0))
+        termino_anterior = np.r_[-1, maximo][:-1] - deslocamento + base
+        anterior = np.r_[0, dono][:-1]
+        sobreposta = mesmo_colaborador & ~duplicada & (ini <= termino_anterior)
+
+        # Linha na planilha de origem, para localizar o registro a corrigir
+        if 'linha_planilha' in self.df.columns:
+            linha_planilha = self.df['linha_planilha'].to_numpy()
+        else:
+            linha_planilha = np.arange(2, n + 2)
+
+        def linhas(tipo, selecao, referencias=None, dias=None):
+            vazio = [pd.NA] * len(selecao)
+            return pd.DataFrame({
+                'tipo': tipo,
+                'posicao': selecao,
+                'linha_referencia': pd.array(vazio if referencias is None else referencias, dtype='Int64'),
+                'dias_sobreposicao': pd.array(vazio if dias is None else dias, dtype='Int64'),
+            })
+
+        partes = [
+            linhas('SOBREPOSICAO', posicoes[sobreposta],
+                   linha_planilha[posicoes[anterior[sobreposta]]],
+                   np.minimum(ter, termino_anterior)[sobreposta] - ini[sobreposta] + 1),
+            linhas('DUPLICADA', posicoes[duplicada],
+                   linha_planilha[posicoes[np.flatnonzero(duplicada) - 1]]),
+        ] + [linhas(tipo, np.flatnonzero(marcada)) for tipo, marcada in marcadas.items()]
+        achados = pd.concat(partes, ignore_index=True)
+
+        linhas_afetadas = self.df.iloc[achados['posicao'].to_numpy()]
+        colunas = [coluna for coluna in ['colaborador', 'supervisor', 'origem', 'regiao', 'inicio', 'termino',
+                                         'base_campo'] if coluna in self.df.columns]
+        resultado = pd.concat([
+            pd.DataFrame({
+                'tipo': pd.Categorical(achados['tipo'], categories=[t[0] for t in TIPOS_INCONSISTENCIA]),
+                'linha': linha_planilha[achados['posicao'].to_numpy()],
+            }),
+            linhas_afetadas[colunas].reset_index(drop=True),
+            achados[['linha_referencia', 'dias_sobreposicao']],
+        ], axis=1)
+        ordem = ['tipo', 'regiao', 'linha'] if 'regiao' in resultado.columns else ['tipo', 'linha']
+        return resultado.sort_values(ordem, kind='stable', ignore_index=True)
+
+    def audit_folgas(self, intervalo_minimo: int = INTERVALO_MINIMO_DIAS,
+                     limite_critico: int = LIMITE_CRITICO_DIAS) -> pd.DataFrame:
+        """Audita intervalos entre folgas consecutivas de cada colaborador"""
+        chave = ('auditoria', intervalo_minimo, limite_critico)
+        with METRICAS.medir('audit_folgas', linhas=len(self.df)) as registro:
+            registro['cache'] = 'hit' if chave in self._tabelas else 'miss'
+            return self._tabela_em_cache(chave, lambda: self._auditar_intervalos(intervalo_minimo, limite_critico))
+
+    def _auditar_intervalos(self, intervalo_minimo: int, limite_critico: int) -> pd.DataFrame:
+        # Períodos invertidos e sobreposições são apontados por validar_folgas, não como intervalo curto
+        folgas = self.df.dropna(subset=['inicio', 'termino'])
+        folgas = folgas[folgas['termino'] >= folgas['inicio']]
+
+        # Ordenação única por (colaborador, início); colaboradores na ordem em que aparecem
+        codigos, _ = pd.factorize(folgas['colaborador'])
+        ordem = np.lexsort((folgas['inicio'].to_numpy(), codigos))
+        folgas = folgas.iloc[ordem]
+        codigos = codigos[ordem]
+
+        # Comparar cada folga com a seguinte do mesmo colaborador
+        mesmo_colaborador = codigos[1:] == codigos[:-1]
+        termino_atual = folgas['termino'].to_numpy()[:-1]
+        inicio_proximo = folgas['inicio'].to_numpy()[1:]
+        intervalo = (inicio_proximo - termino_atual) // np.timedelta64(1, 'D')
+
+        problema = mesmo_colaborador & (intervalo > 0) & (intervalo < intervalo_minimo)
+        posicoes = np.flatnonzero(problema)
+
+        problemas = pd.DataFrame({
+            'colaborador': folgas['colaborador'].to_numpy()[posicoes],
+            'folga1_termino': pd.to_datetime(termino_atual[posicoes]),
+            'folga2_inicio': pd.to_datetime(inicio_proximo[posicoes]),
+            'dias_intervalo': intervalo[posicoes].astype(int),
+            'supervisor': (folgas['supervisor'].to_numpy()[posicoes]
+                           if 'supervisor' in folgas.columns else 'N/A'),
+        })
+        problemas['critico'] = problemas['dias_intervalo'] < limite_critico
+        return problemas
+
+
+class VerificadorEfetivo:
+    """Confere se cada folga futura deixa a base de origem abaixo do efetivo mínimo.
+
+    Inícios e términos das folgas viram duas listas ordenadas de eventos com a
+    base como prefixo da chave (base * extensao + dia). As folgas da mesma base
+    que tocam a janela [inicio, termino] são (inícios <= termino) - (términos <
+    inicio), duas buscas binárias por consulta. O pico de ausentes simultâneos
+    na janela vem da linha de varredura diária da base.
+    """
+
+    def __init__(self, analyzer: 'CronogramaAnalyzer', minimos: Dict[str, int] = None,
+                 efetivo_minimo: int = EFETIVO_MINIMO_PADRAO):
+        self.analyzer = analyzer
+        self.minimos = minimos or {}
+        self.efetivo_minimo = efetivo_minimo
+
+    def verificar(self, data_referencia) -> pd.DataFrame:
+        """Uma linha por folga futura (mesmo índice do status), com ausentes, em serviço e déficit"""
+        colunas = ['origem', 'efetivo', 'minimo', 'colegas_ausentes', 'pico_ausentes', 'em_servico', 'deficit',
+                   'atende']
+        status = self.analyzer.get_status_atual(data_referencia)
+        futuras = status[(status['dias_para_folga'] > 0) & (status['status'] != "SEM_PROGRAMAÇÃO")
+                         & (status['termino'] >= status['inicio'])]
+        efetivo = self.analyzer.efetivo_por_base()
+        # Folgas sem base de origem conhecida não têm efetivo a conferir
+        futuras = futuras[efetivo.index.get_indexer(futuras['origem']) >= 0]
+        if futuras.empty or efetivo.empty:
+            return pd.DataFrame(columns=colunas)
+
+        folgas = self.analyzer.df.dropna(subset=['inicio', 'termino', 'origem'])
+        folgas = folgas[folgas['termino'] >= folgas['inicio']]
+        base = efetivo.index.get_indexer(folgas['origem'])
+        inicio = _datas_em_dias(folgas, 'inicio').astype(np.int64)
+        termino = _datas_em_dias(folgas, 'termino').astype(np.int64)
+
+        consulta_base = efetivo.index.get_indexer(futuras['origem'])
+        consulta_inicio = _datas_em_dias(futuras, 'inicio').astype(np.int64)
+        consulta_termino = _datas_em_dias(futuras, 'termino').astype(np.int64)
+
+        # Eventos ordenados com a base como prefixo da chave
+        primeiro_dia = inicio.min()
+        extensao = termino.max() - primeiro_dia + 2
+        chave_inicios = np.sort(base * extensao + (inicio - primeiro_dia))
+        chave_terminos = np.sort(base * extensao + (termino - primeiro_dia))
+        prefixo = consulta_base * extensao
+        # Bases anteriores entram nas duas contagens e se cancelam; a própria folga sempre toca a janela
+        iniciadas = np.searchsorted(chave_inicios, prefixo + consulta_termino - primeiro_dia, side='right')
+        encerradas = np.searchsorted(chave_terminos, prefixo + consulta_inicio - primeiro_dia, side='left')
+        colegas_ausentes = iniciadas - encerradas - 1
+
+        # Linha de varredura diária por base: pico de ausentes simultâneos dentro da janela
+        eventos = np.zeros(len(efetivo) * extensao + 1, dtype=np.int32)
+        np.add.at(eventos, base * extensao + (inicio - primeiro_dia), 1)
+        np.add.at(eventos, base * extensao + (termino - primeiro_dia) + 1, -1)
+        ausentes_no_dia = np.cumsum(eventos)
+        tamanhos = consulta_termino - consulta_inicio + 1
+        deslocamentos = np.r_[0, np.cumsum(tamanhos)[:-1]]
+        dias = (np.repeat(prefixo + consulta_inicio - primeiro_dia - deslocamentos, tamanhos)
+                + np.arange(tamanhos.sum()))
+        pico_ausentes = np.maximum.reduceat(ausentes_no_dia[dias], deslocamentos) - 1
+
+        origem = futuras['origem'].astype(object)
+        total = efetivo.to_numpy()[consulta_base]
+        minimo = self.analyzer.minimos_por_base(self.minimos, self.efetivo_minimo).to_numpy()[consulta_base]
+        em_servico = total - 1 - pico_ausentes
+        resultado = pd.DataFrame({
+            'origem': origem,
+            'efetivo': total,
+            'minimo': minimo,
+            'colegas_ausentes': colegas_ausentes,
+            'pico_ausentes': pico_ausentes,
+            'em_servico': em_servico,
+            'deficit': np.maximum(minimo - em_servico, 0),
+            'atende': em_servico >= minimo,
+        }, index=futuras.index)
+        return resultado
+
+
+class CuboFolgas:
+    """Folgas e dias de folga pré-agregados por supervisor × origem × destino × mês × status.
+
+    Cada folga é repartida pelos meses que atravessa (dias de folga dentro de
+    cada mês); a contagem de folgas fica no mês de início. Como as medidas são
+    somáveis, qualquer fatia ou total dos relatórios é um groupby sobre as
+    células do cubo, sem voltar ao DataFrame original.
+    """
+
+    def __init__(self, analyzer: 'CronogramaAnalyzer', data_referencia):
+        self.data_referencia = data_referencia
+        self.celulas = self._montar(analyzer, data_referencia)
+
+    @staticmethod
+    def _montar(analyzer: 'CronogramaAnalyzer', data_referencia) -> pd.DataFrame:
+        df = analyzer.df
+        n = len(df)
+
+        inicio = _datas_em_dias(df, 'inicio')
+        termino = _datas_em_dias(df, 'termino')
+        valida = ~np.isnat(inicio) & ~np.isnat(termino) & (termino >= inicio)
+
+        # Uma linha por (folga, mês atravessado)
+        mes_inicio = inicio.astype('datetime64[M]')
+        meses = np.ones(n, dtype=np.int64)
+        meses[valida] = (termino[valida].astype('datetime64[M]') - mes_inicio[valida]).astype(np.int64) + 1
+        linha = np.repeat(np.arange(n), meses)
+        deslocamento = np.arange(len(linha)) - np.repeat(np.cumsum(meses) - meses, meses)
+        mes = mes_inicio[linha] + deslocamento
+
+        dias_folga = np.zeros(len(linha), dtype=np.int64)
+        partes = valida[linha]
+        primeiro_dia = np.maximum(inicio[linha][partes], mes[partes].astype('datetime64[D]'))
+        ultimo_dia = np.minimum(termino[linha][partes], (mes[partes] + 1).astype('datetime64[D]') - 1)
+        dias_folga[partes] = (ultimo_dia - primeiro_dia).astype(np.int64) + 1
+
+        # Status do cronograma na data de referência; folgas encerradas ficam como concluídas
+        status = analyzer.status_por_linha(data_referencia)
+        ordem_status = [s[0] for s in STATUS_FOLGA] + [STATUS_CONCLUIDA]
+
+        celulas = pd.DataFrame({
+            dimensao: (df[dimensao].iloc[linha].to_numpy() if dimensao in df.columns else 'N/A')
+            for dimensao in ['supervisor', 'origem', 'destino']
+        })
+        celulas = celulas.astype('category').assign(
+            mes=pd.to_datetime(mes),
+            status=pd.Categorical(status.to_numpy()[linha], categories=ordem_status),
+            folgas=(deslocamento == 0).astype(np.int64),
+            dias_folga=dias_folga,
+        )
+        return (celulas.groupby(DIMENSOES_CUBO, observed=True, dropna=False, sort=True)[MEDIDAS_CUBO]
+                .sum().reset_index())
+
+    def fatiar(self, **filtros) -> pd.DataFrame:
+        """Células do cubo restritas aos valores de cada dimensão informada (vazio = todos)"""
+        mascara = np.ones(len(self.celulas), dtype=bool)
+        for dimensao, valores in filtros.items():
+            if valores:
+                mascara &= self.celulas[dimensao].isin(list(valores)).to_numpy()
+        return self.celulas[mascara]
+
+    def totais(self, por, **filtros) -> pd.DataFrame:
+        """Folgas e dias de folga somados por uma ou mais dimensões"""
+        return self.fatiar(**filtros).groupby(por, observed=True, sort=True)[MEDIDAS_CUBO].sum()
+
+    def distintos(self, por, dimensao, **filtros) -> pd.Series:
+        """Valores distintos de uma dimensão em cada grupo (ex.: origens por supervisor)"""
+        return self.fatiar(**filtros).groupby(por, observed=True, sort=True)[dimensao].nunique()
+
+    def tabela(self, linhas, colunas, medida: str = 'dias_folga', **filtros) -> pd.DataFrame:
+        """Tabela dinâmica de uma medida (linhas × colunas) sobre a fatia"""
+        return self.fatiar(**filtros).pivot_table(
+            index=linhas, columns=colunas, values=medida, aggfunc='sum', fill_value=0, observed=True
+        )
+
+
+class OtimizadorFolgas:
+    """Propõe novas datas para folgas futuras que violam as regras de escala.
+
+    Cada colaborador é uma cadeia de folgas ordenadas. Com a transformação
+    t_k = inicio_k - soma(duracao_j + intervalo_minimo) das folgas anteriores,
+    a regra do intervalo vira t_k <= t_{k+1}, e o menor deslocamento total é
+    uma regressão isotônica L1 (pool adjacent violators com medianas). Folgas
+    já iniciadas na data de referência não são movidas. Depois, uma busca
+    local adia folgas que deixam a base abaixo do efetivo mínimo, sem quebrar
+    a regra do intervalo. O ajuste de intervalo de um colaborador só é aceito
+    se não aumentar os dias com a base abaixo do mínimo.
+    """
+
+    def __init__(self, analyzer: 'CronogramaAnalyzer', data_referencia=None,
+                 intervalo_minimo: int = INTERVALO_MINIMO_DIAS,
+                 efetivo_minimo: int = EFETIVO_MINIMO_PADRAO,
+                 deslocamento_maximo: int = 60, max_iteracoes: int = 5000, minimos: Dict[str, int] = None):
+        if data_referencia is None:
+            data_referencia = datetime.now().date()
+        self.analyzer = analyzer
+        self.hoje = int(np.datetime64(data_referencia, 'D').astype(np.int64))
+        self.intervalo_minimo = intervalo_minimo
+        self.efetivo_minimo = efetivo_minimo
+        self.minimos = minimos or {}
+        self.deslocamento_maximo = deslocamento_maximo
+        self.max_iteracoes = max_iteracoes
+        self.ausencias_permitidas = np.zeros(0, dtype=int)
+        self.resumo = {}
+
+    @staticmethod
+    def _isotonica_l1(valores: List[int]) -> List[int]:
+        """Sequência não decrescente mais próxima (norma L1) dos valores"""
+        blocos = []
+        for valor in valores:
+            blocos.append([valor])
+            # Mediana superior: em empates, mantém as folgas anteriores e adia as seguintes
+            while len(blocos) > 1 and blocos[-2][len(blocos[-2]) // 2] > blocos[-1][len(blocos[-1]) // 2]:
+                ultimo = blocos.pop()
+                blocos[-1] = sorted(blocos[-1] + ultimo)
+        return [bloco[len(bloco) // 2] for bloco in blocos for _ in bloco]
+
+    def _violacoes_intervalo(self, codigos: np.ndarray, inicio: np.ndarray, termino: np.ndarray) -> int:
+        mesmo_colaborador = codigos[1:] == codigos[:-1]
+        return int((mesmo_colaborador & (inicio[1:] - termino[:-1] < self.intervalo_minimo)).sum())
+
+    def _ajustar_intervalos(self, codigos: np.ndarray, inicio: np.ndarray, termino: np.ndarray) -> np.ndarray:
+        novo_inicio = inicio.copy()
+        limites = np.flatnonzero(np.diff(codigos)) + 1
+        for cadeia in np.split(np.arange(len(codigos)), limites):
+            moveis = cadeia[inicio[cadeia] > self.hoje]
+            if len(moveis) == 0:
+                continue
+            fixas = cadeia[inicio[cadeia] <= self.hoje]
+
+            # Deslocamento acumulado de cada folga móvel em relação à primeira
+            passos = (termino[moveis] - inicio[moveis])[:-1] + self.intervalo_minimo
+            acumulado = np.concatenate([[0], np.cumsum(passos)])
+            t = inicio[moveis] - acumulado
+            if not np.any(np.diff(t) < 0) and (len(fixas) == 0 or
+                                               inicio[moveis[0]] - termino[fixas[-1]] >= self.intervalo_minimo):
+                continue
+
+            # A primeira folga móvel não pode começar antes de amanhã nem colada à última folga fixa
+            piso = self.hoje + 1
+            if len(fixas):
+                piso = max(piso, termino[fixas[-1]] + self.intervalo_minimo)
+            t_ajustado = np.maximum(self._isotonica_l1(t.tolist()), piso)
+            novo_inicio[moveis] = t_ajustado + acumulado
+        return novo_inicio
+
+    def _matriz_ausencias(self, base, inicio, termino, ultimo_dia=None):
+        """Ausentes por base e dia (linha de varredura), com folga para adiamentos"""
+        origem_eixo = int(min(inicio.min(), self.hoje))
+        ultimo_dia = int(termino.max()) if ultimo_dia is None else max(int(termino.max()), int(ultimo_dia))
+        dias = ultimo_dia - origem_eixo + self.deslocamento_maximo + 2
+        eventos = np.zeros((self.ausencias_permitidas.size, dias + 1), dtype=np.int32)
+        np.add.at(eventos, (base, inicio - origem_eixo), 1)
+        np.add.at(eventos, (base, termino - origem_eixo + 1), -1)
+        return np.cumsum(eventos[:, :dias], axis=1), origem_eixo
+
+    def _aceitar_intervalos(self, codigos, base, inicio, termino, novo_inicio) -> np.ndarray:
+        """Desfaz, colaborador a colaborador, os ajustes de intervalo que pioram o efetivo das bases"""
+        com_base = base >= 0
+        if not com_base.any():
+            return novo_inicio
+        novo_termino = termino + (novo_inicio - inicio)
+        ausentes, origem_eixo = self._matriz_ausencias(base[com_base], inicio[com_base], termino[com_base],
+                                                       novo_termino.max())
+        futuro = self.hoje - origem_eixo
+        permitidas = self.ausencias_permitidas
+
+        def mover(folgas, de, para):
+            for i in folgas:
+                ausentes[base[i], de[i] - origem_eixo:de[i] - origem_eixo + termino[i] - inicio[i] + 1] -= 1
+                ausentes[base[i], para[i] - origem_eixo:para[i] - origem_eixo + termino[i] - inicio[i] + 1] += 1
+
+        aceito = novo_inicio.copy()
+        limites = np.flatnonzero(np.diff(codigos)) + 1
+        for cadeia in np.split(np.arange(len(codigos)), limites):
+            movidas = cadeia[(novo_inicio[cadeia] != inicio[cadeia]) & com_base[cadeia]]
+            if len(movidas) == 0:
+                continue
+            bases = np.unique(base[movidas])
+            antes = int((ausentes[bases, futuro:] > permitidas[bases, None]).sum())
+            mover(movidas, inicio, novo_inicio)
+            if int((ausentes[bases, futuro:] > permitidas[bases, None]).sum()) > antes:
+                mover(movidas, novo_inicio, inicio)
+                aceito[cadeia] = inicio[cadeia]
+        return aceito
+
+    def _dias_abaixo_minimo(self, base, inicio, termino) -> int:
+        """Quantidade de pares (base, dia) futuros abaixo do efetivo mínimo"""
+        com_base = base >= 0
+        if not com_base.any():
+            return 0
+        ausentes, origem_eixo = self._matriz_ausencias(base[com_base], inicio[com_base], termino[com_base])
+        futuro = ausentes[:, self.hoje - origem_eixo:]
+        return int((futuro > self.ausencias_permitidas[:, None]).sum())
+
+    def _ajustar_efetivo(self, codigos, base, inicio, termino, movel):
+        """Busca local: adia folgas que deixam a base abaixo do efetivo mínimo (altera inicio/termino)"""
+        com_base = base >= 0
+        if not com_base.any():
+            return
+        ausentes, origem_eixo = self._matriz_ausencias(base[com_base], inicio[com_base], termino[com_base])
+        permitidas = self.ausencias_permitidas
+        hoje = self.hoje - origem_eixo
+
+        # Próxima folga de cada cadeia, para não quebrar a regra do intervalo ao adiar
+        proxima = np.append(np.where(codigos[1:] == codigos[:-1], np.arange(1, len(codigos)), -1), -1)
+        moveis = np.flatnonzero(movel & com_base)
+        moveis_por_base = {b: moveis[base[moveis] == b] for b in np.unique(base[moveis])}
+
+        iteracoes = 0
+        houve_ajuste = True
+        while houve_ajuste and iteracoes < self.max_iteracoes:
+            houve_ajuste = False
+            excesso = ausentes[:, hoje:] > permitidas[:, None]
+            excesso[permitidas < 1] = False  # Base sem folga possível: não há o que adiar
+            for b, d in np.argwhere(excesso):
+                iteracoes += 1
+                if iteracoes > self.max_iteracoes:
+                    break
+                dia = d + self.hoje
+                if ausentes[b, d + hoje] <= permitidas[b]:
+                    continue  # Resolvido por um ajuste anterior
+
+                melhor = None
+                candidatas = moveis_por_base.get(b, np.zeros(0, dtype=int))
+                for i in candidatas[(inicio[candidatas] <= dia) & (termino[candidatas] >= dia)]:
+                    limite = self.deslocamento_maximo
+                    if proxima[i] >= 0:
+                        limite = min(limite, inicio[proxima[i]] - self.intervalo_minimo - termino[i])
+                    primeiro = dia - inicio[i] + 1
+                    if limite < primeiro:
+                        continue
+
+                    # Menor adiamento cuja janela inteira fica dentro do limite de ausências
+                    ini, fim = inicio[i] - origem_eixo, termino[i] - origem_eixo
+                    duracao = fim - ini + 1
+                    ausentes[b, ini:fim + 1] -= 1
+                    livre = ausentes[b, ini + primeiro:fim + limite + 1] < permitidas[b]
+                    ausentes[b, ini:fim + 1] += 1
+                    acumulado = np.concatenate([[0], np.cumsum(livre)])
+                    janelas = np.flatnonzero(acumulado[duracao:] - acumulado[:-duracao] == duracao)
+                    if len(janelas) and (melhor is None or primeiro + janelas[0] < melhor[1]):
+                        melhor = (i, primeiro + janelas[0])
+
+                if melhor is None:
+                    continue
+
+                i, delta = melhor
+                ini, fim = inicio[i] - origem_eixo, termino[i] - origem_eixo
+                ausentes[b, ini:fim + 1] -= 1
+                ausentes[b, ini + delta:fim + delta + 1] += 1
+                inicio[i] += delta
+                termino[i] += delta
+                houve_ajuste = True
+
+    def otimizar(self) -> pd.DataFrame:
+        """Retorna as folgas com as datas propostas e o deslocamento de cada uma"""
+        folgas = self.analyzer.df.dropna(subset=['inicio', 'termino'])
+        folgas = folgas[folgas['termino'] >= folgas['inicio']]
+
+        codigos, _ = pd.factorize(folgas['colaborador'])
+        inicio = _datas_em_dias(folgas, 'inicio').astype(np.int64)
+        termino = _datas_em_dias(folgas, 'termino').astype(np.int64)
+        ordem = np.lexsort((inicio, codigos))
+        folgas, codigos, inicio, termino = folgas.iloc[ordem], codigos[ordem], inicio[ordem], termino[ordem]
+        movel = inicio > self.hoje
+
+        efetivo = self.analyzer.efetivo_por_base()
+        self.ausencias_permitidas = (efetivo - self.analyzer.minimos_por_base(self.minimos,
+                                                                             self.efetivo_minimo)).to_numpy()
+        base = (efetivo.index.get_indexer(folgas['origem']) if 'origem' in folgas.columns
+                else np.full(len(folgas), -1))
+
+        # Etapa 1: regra do intervalo mínimo, sem piorar o efetivo das bases
+        novo_inicio = self._ajustar_intervalos(codigos, inicio, termino)
+        novo_inicio = self._aceitar_intervalos(codigos, base, inicio, termino, novo_inicio)
+        novo_termino = termino + (novo_inicio - inicio)
+
+        # Etapa 2: efetivo mínimo por base
+        self._ajustar_efetivo(codigos, base, novo_inicio, novo_termino, movel)
+
+        deslocamento = novo_inicio - inicio
+        self.resumo = {
+            'violacoes_antes': self._violacoes_intervalo(codigos, inicio, termino),
+            'violacoes_depois': self._violacoes_intervalo(codigos, novo_inicio, novo_termino),
+            'dias_abaixo_minimo_antes': self._dias_abaixo_minimo(base, inicio, termino),
+            'dias_abaixo_minimo_depois': self._dias_abaixo_minimo(base, novo_inicio, novo_termino),
+            'folgas_alteradas': int((deslocamento != 0).sum()),
+            'dias_deslocados': int(np.abs(deslocamento).sum()),
+        }
+
+        proposta = folgas[[coluna for coluna in ['colaborador', 'supervisor', 'origem', 'destino', 'inicio', 'termino']
+                           if coluna in folgas.columns]].copy()
+        proposta['inicio_proposto'] = pd.to_datetime(novo_inicio.astype('datetime64[D]'))
+        proposta['termino_proposto'] = pd.to_datetime(novo_termino.astype('datetime64[D]'))
+        proposta['deslocamento_dias'] = deslocamento
+        return proposta
+
+
+class SnapshotStore:
+    """Snapshot local em Parquet dos dados já processados"""
+
+    def __init__(self, caminho: str = SNAPSHOT_PATH):
+        self.caminho = caminho
+
+    def salvar(self, df: pd.DataFrame, versao: str):
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        compacto = df.reset_index(drop=True).astype({
+            coluna: 'category' for coluna in COLUNAS_CATEGORICAS if coluna in df.columns
+        })
+        tabela = pa.Table.from_pandas(compacto, preserve_index=False)
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[b'cronograma_versao'] = str(versao).encode('utf-8')
+
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        temporario = f"{self.caminho}.tmp"
+        pq.write_table(tabela.replace_schema_metadata(metadados), temporario)
+        os.replace(temporario, self.caminho)
+
+    def modificado_em(self):
+        """Horário (epoch) da gravação do snapshot, ou None se ele não existe"""
+        try:
+            return os.path.getmtime(self.caminho)
+        except OSError:
+            return None
+
+    def carregar(self) -> Tuple:
+        """Lê o snapshot, retornando (df, versao) ou (None, None) se indisponível"""
+        if not os.path.exists(self.caminho):
+            return None, None
+
+        try:
+            import pyarrow.parquet as pq
+
+            tabela = pq.read_table(self.caminho)
+            versao = (tabela.schema.metadata or {}).get(b'cronograma_versao', b'').decode('utf-8')
+            df = tabela.to_pandas()
+        except Exception:
+            return None, None
+
+        # Colunas category e float32 voltam com os mesmos tipos do processamento
+        return df, versao or None
+
+
+class RepositorioCronograma:
+    """Mantém a versão atual dos dados, com snapshot local e atualização agendada em segundo plano.
+
+    Leitores recebem sempre a última versão publicada (stale-while-revalidate); apenas a
+    primeira carga, sem snapshot, espera pelo SharePoint.
+    """
+
+    TTL = 300  # Segundos entre consultas ao SharePoint
+
+    def __init__(self, connector, snapshot: SnapshotStore):
+        self.connector = connector
+        self.snapshot = snapshot
+        self.analyzer = None
+        self.versao = None
+        self.fonte = None
+        self.offline = False
+        self.verificado_em = None
+        self.atualizado_em = None  # Quando os dados publicados foram confirmados como atuais
+        self._lock = threading.Lock()
+        self._agendador = None
+
+    def _publicar(self, analyzer: CronogramaAnalyzer, versao: str, fonte: str):
+        # Troca atômica: leitores veem a versão anterior ou a nova, nunca um estado parcial
+        self.analyzer, self.versao, self.fonte = analyzer, versao, fonte
+
+    def iniciar(self):
+        """Serve imediatamente do snapshot local e atualiza do SharePoint em segundo plano"""
+        df, versao = self.snapshot.carregar()
+        if df is not None:
+            self._publicar(CronogramaAnalyzer.from_processed(df), versao, 'snapshot')
+            self.atualizado_em = self.snapshot.modificado_em()
+        else:
+            self.atualizar()
+        self.agendar()
+
+    def atualizar(self) -> bool:
+        """Consulta o SharePoint e publica uma nova versão se a planilha mudou"""
+        with self._lock:
+            df, versao = self.connector.get_data()
+            self.verificado_em = time.time()
+            if df is None:
+                # Sem acesso ao Graph: continua servindo a última versão conhecida
+                self.offline = True
+                return False
+
+            self.offline = False
+            self.atualizado_em = self.verificado_em
+            if versao != self.versao or self.analyzer is None:
+                inicio = time.perf_counter()
+                analyzer = CronogramaAnalyzer(df)
+                analyzer.tempo_processamento = time.perf_counter() - inicio
+                analyzer.construido_em = time.time()
+                self._publicar(analyzer, versao, 'sharepoint')
+                try:
+                    self.snapshot.salvar(analyzer.df, versao)
+                except Exception:
+                    pass  # O snapshot é apenas uma otimização
+            else:
+                self.fonte = 'sharepoint'
+            return True
+
+    def agendar(self):
+        """Inicia (uma única vez) a thread que consulta o SharePoint a cada TTL"""
+        if self._agendador is None or not self._agendador.is_alive():
+            self._agendador = threading.Thread(target=self._executar_agendamento, daemon=True)
+            self._agendador.start()
+
+    def _executar_agendamento(self):
+        while True:
+            # Atualizações manuais também renovam verificado_em e adiam a próxima consulta
+            espera = 0 if self.verificado_em is None else self.verificado_em + self.TTL - time.time()
+            if espera > 0:
+                time.sleep(espera)
+                continue
+            try:
+                self.atualizar()
+            except Exception:
+                self.verificado_em = time.time()  # Tenta de novo no próximo ciclo
+
+    def idade(self):
+        """Segundos desde que os dados publicados foram confirmados como atuais"""
+        if self.atualizado_em is None:
+            return None
+        return time.time() - self.atualizado_em
+
+    def obter(self):
+        """Retorna o analisador atual sem esperar pelo SharePoint (exceto na primeira carga)"""
+        if self.analyzer is None:
+            self.iniciar()
+        else:
+            self.agendar()
+        return self.analyzer
@@ -0,0 +1,113 @@
+"""Exportação das tabelas do cronograma em CSV, Parquet e xlsx.
+
+Cada formato é escrito em blocos de linhas num buffer de bytes, sem montar o
+arquivo inteiro como texto. Sem dependências de interface: o cache dos bytes
+por versão dos dados fica no analisador (CronogramaAnalyzer.exportar).
+"""
+import io
+
+import pandas as pd
+
+TAMANHO_BLOCO = 50_000
+
+# Datas no padrão brasileiro, como em CronogramaAnalyzer.format_date_br
+FORMATO_DATA_BR = "%d/%m/%Y"
+FORMATO_DATA_EXCEL = "DD/MM/YYYY"
+LARGURA_MAXIMA_COLUNA = 50
+
+# formato: (extensão do arquivo, tipo MIME)
+FORMATOS_EXPORTACAO = {
+    'csv': ('csv', 'text/csv'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def _blocos(df: pd.DataFrame, tamanho: int):
+    """Fatias consecutivas de até `tamanho` linhas; um bloco vazio para tabelas vazias (só cabeçalho)"""
+    if df.empty:
+        yield df
+        return
+    for inicio in range(0, len(df), tamanho):
+        yield df.iloc[inicio:inicio + tamanho]
+
+
+def _escrever_csv(df: pd.DataFrame, buffer: io.BytesIO, tamanho: int):
+    # utf-8 com BOM: acentos corretos ao abrir direto no Excel
+    texto = io.TextIOWrapper(buffer, encoding='utf-8-sig', newline='')
+    for numero, bloco in enumerate(_blocos(df, tamanho)):
+        bloco.to_csv(texto, index=False, header=numero == 0, date_format=FORMATO_DATA_BR)
+    texto.flush()
+    texto.detach()
+
+
+def _escrever_parquet(df: pd.DataFrame, buffer: io.BytesIO, tamanho: int):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Um row group por bloco, todos com o esquema da tabela inteira
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(buffer, esquema) as escritor:
+        for bloco in _blocos(df, tamanho):
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+
+
+def _escrever_xlsx(df: pd.DataFrame, buffer: io.BytesIO, tamanho: int, aba: str):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    # Modo write-only: cada linha vai direto para o XML da aba, sem manter as células em memória
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet(aba)
+    planilha.freeze_panes = 'A2'
+    planilha.auto_filter.ref = f"A1:{get_column_letter(max(len(df.columns), 1))}{len(df) + 1}"
+
+    # Larguras e formato de data por coluna, definidos antes da primeira linha
+    celulas_data = []
+    for posicao, coluna in enumerate(df.columns):
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            # Uma célula com o formato por coluna, reaproveitada: a linha é gravada no append
+            celula = WriteOnlyCell(planilha)
+            celula.number_format = FORMATO_DATA_EXCEL
+            celulas_data.append((posicao, celula))
+            largura = len(FORMATO_DATA_EXCEL)
+        else:
+            largura = df[coluna].astype(str).str.len().max() if not df.empty else 0
+        largura = min(max(largura, len(str(coluna))) + 2, LARGURA_MAXIMA_COLUNA)
+        planilha.column_dimensions[get_column_letter(posicao + 1)].width = largura
+
+    cabecalho = []
+    for coluna in df.columns:
+        celula = WriteOnlyCell(planilha, value=str(coluna))
+        celula.font = Font(bold=True)
+        cabecalho.append(celula)
+    planilha.append(cabecalho)
+
+    for bloco in _blocos(df, tamanho):
+        valores = bloco.astype(object).where(bloco.notna(), None)
+        for linha in valores.itertuples(index=False, name=None):
+            linha = list(linha)
+            for posicao, celula in celulas_data:
+                if linha[posicao] is not None:
+                    celula.value = linha[posicao]
+                    linha[posicao] = celula
+            planilha.append(linha)
+
+    livro.save(buffer)
+
+
+def exportar(df: pd.DataFrame, formato: str, tamanho_bloco: int = TAMANHO_BLOCO, aba: str = 'Cronograma') -> bytes:
+    """Conteúdo do arquivo no formato pedido (csv, parquet ou xlsx)"""
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+
+    buffer = io.BytesIO()
+    if formato == 'csv':
+        _escrever_csv(df, buffer, tamanho_bloco)
+    elif formato == 'parquet':
+        _escrever_parquet(df, buffer, tamanho_bloco)
+    else:
+        _escrever_xlsx(df, buffer, tamanho_bloco, aba)
+    return buffer.getvalue()
@@ -0,0 +1,199 @@
+"""Mapas folium das bases e das movimentações das equipes, sem dependência do Streamlit."""
+import folium
+import numpy as np
+import pandas as pd
+from folium.plugins import FastMarkerCluster
+
+from cronograma_core import CIDADES_PARA
+from cronograma_metricas import METRICAS
+
+# Bases operacionais em GeoJSON, montado uma única vez para a camada do mapa
+CIDADES_GEOJSON = {
+    'type': 'FeatureCollection',
+    'features': [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [coords['lon'], coords['lat']]},
+            'properties': {'nome': nome, 'popup': f"<b>{nome}</b><br>Base Operacional"},
+        }
+        for nome, coords in CIDADES_PARA.items()
+    ],
+}
+
+
+def camada_cidades(nomes=None) -> folium.GeoJson:
+    """Camada com as bases operacionais, a partir do GeoJSON pré-calculado"""
+    features = CIDADES_GEOJSON['features']
+    if nomes is not None:
+        features = [f for f in features if f['properties']['nome'] in nomes]
+
+    return folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        name='Bases Operacionais',
+        marker=folium.Marker(icon=folium.Icon(color='orange', icon='home')),
+        tooltip=folium.GeoJsonTooltip(fields=['nome'], labels=False),
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+    )
+
+
+def _texto_periodo(df: pd.DataFrame) -> pd.Series:
+    """Período da folga formatado (dd/mm/aaaa - dd/mm/aaaa) para popups"""
+    inicio = df['inicio'].dt.strftime("%d/%m/%Y").fillna('N/A')
+    termino = df['termino'].dt.strftime("%d/%m/%Y").fillna('N/A')
+    return inicio + " - " + termino
+
+
+def agregar_fluxos(df: pd.DataFrame) -> pd.DataFrame:
+    """Agrupa as movimentações por par origem → destino (no máximo 27 × 27 pares)"""
+    coordenadas = ['origem_lat', 'origem_lon', 'destino_lat', 'destino_lon']
+    if not set(coordenadas).issubset(df.columns):
+        return pd.DataFrame(columns=coordenadas + ['origem', 'destino', 'quantidade', 'colaboradores'])
+
+    rotas = df.dropna(subset=coordenadas)
+    fluxos = rotas.groupby(coordenadas, sort=False).agg(
+        origem=('origem', 'first'),
+        destino=('destino', 'first'),
+        quantidade=('colaborador', 'size'),
+        colaboradores=('colaborador', lambda nomes: ', '.join(sorted(set(map(str, nomes))))),
+    ).reset_index()
+    # Com um colaborador por par o pandas devolve a lista ainda como category: texto para o popup
+    fluxos['colaboradores'] = fluxos['colaboradores'].astype(str)
+    # Coordenadas float32 em float64 arredondado, para um GeoJSON curto
+    fluxos[coordenadas] = fluxos[coordenadas].astype('float64').round(5)
+    return fluxos.sort_values('quantidade', ascending=False, kind='stable')
+
+
+@METRICAS.cronometrado('create_flow_map', linhas=len)
+def create_flow_map(df: pd.DataFrame) -> folium.Map:
+    """Cria mapa com uma linha por par origem → destino, com espessura pelo volume"""
+    m = folium.Map(
+        location=[-3.7, -52.0],
+        zoom_start=6,
+        tiles='OpenStreetMap'
+    )
+    camada_cidades().add_to(m)
+
+    fluxos = agregar_fluxos(df)
+    if fluxos.empty:
+        return m
+
+    # Espessura entre 2 e 12 px, proporcional à raiz da quantidade
+    espessura = 2 + 10 * np.sqrt(fluxos['quantidade'] / fluxos['quantidade'].max())
+    popup = ("<b>" + fluxos['origem'].astype(str) + " → " + fluxos['destino'].astype(str) + "</b><br>"
+             + "Movimentações: " + fluxos['quantidade'].astype(str) + "<br>"
+             + "Colaboradores: " + fluxos['colaboradores'])
+
+    folium.GeoJson(
+        {
+            'type': 'FeatureCollection',
+            'features': [
+                {
+                    'type': 'Feature',
+                    'geometry': {'type': 'LineString', 'coordinates': [[o_lon, o_lat], [d_lon, d_lat]]},
+                    'properties': {'espessura': round(float(peso), 1), 'popup': texto,
+                                   'tooltip': f"{origem} → {destino}: {quantidade}"},
+                }
+                for o_lat, o_lon, d_lat, d_lon, peso, texto, origem, destino, quantidade in zip(
+                    fluxos['origem_lat'], fluxos['origem_lon'], fluxos['destino_lat'], fluxos['destino_lon'],
+                    espessura, popup, fluxos['origem'], fluxos['destino'], fluxos['quantidade']
+                )
+            ],
+        },
+        name='Fluxos de Folga',
+        style_function=lambda feature: {
+            'color': '#F7931E', 'weight': feature['properties']['espessura'], 'opacity': 0.7
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['tooltip'], labels=False),
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+    ).add_to(m)
+
+    return m
+
+
+@METRICAS.cronometrado('create_map', linhas=len)
+def create_map(df: pd.DataFrame) -> folium.Map:
+    """Cria mapa com as movimentações das equipes"""
+    # Centro do Pará
+    m = folium.Map(
+        location=[-3.7, -52.0],
+        zoom_start=6,
+        tiles='OpenStreetMap'
+    )
+
+    # Adicionar cidades base
+    camada_cidades().add_to(m)
+
+    # Adicionar rotas de folga
+    colors = ['#F7931E', '#000000', 'red', 'green', 'purple', 'orange', 'darkred', 'lightred',
+              'beige', 'darkblue', 'darkgreen', 'cadetblue', 'darkpurple',
+              'white', 'pink', 'lightblue', 'lightgreen', 'gray', 'lightgray']
+    cores_icone = {'#F7931E': 'orange', '#000000': 'black'}
+
+    coordenadas = ['origem_lat', 'origem_lon', 'destino_lat', 'destino_lon']
+    if not set(coordenadas).issubset(df.columns):
+        return m
+
+    # Cor pela posição da linha na tabela, como na lista de cores original
+    cor = pd.Series(np.resize(colors, len(df)), index=df.index)
+    validas = df[coordenadas].notna().all(axis=1)
+    rotas = df[validas]
+    cor = cor[validas]
+    if rotas.empty:
+        return m
+    # Coordenadas float32 em float64 arredondado, para um GeoJSON curto
+    pontos = rotas[coordenadas].astype('float64').round(5)
+
+    colaborador = rotas['colaborador'].astype(str)
+    origem = rotas.get('origem', pd.Series('N/A', index=rotas.index)).astype(str)
+    destino = rotas.get('destino', pd.Series('N/A', index=rotas.index)).astype(str)
+    supervisor = rotas.get('supervisor', pd.Series('N/A', index=rotas.index)).astype(str)
+    periodo = _texto_periodo(rotas)
+
+    # Todas as rotas em uma única FeatureCollection
+    popup_rota = ("<b>" + colaborador + "</b><br>De: " + origem + "<br>Para: " + destino
+                  + "<br>Período: " + periodo)
+    rotas_geojson = {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'LineString', 'coordinates': [[o_lon, o_lat], [d_lon, d_lat]]},
+                'properties': {'cor': c, 'popup': texto},
+            }
+            for o_lat, o_lon, d_lat, d_lon, c, texto in zip(
+                pontos['origem_lat'], pontos['origem_lon'], pontos['destino_lat'], pontos['destino_lon'],
+                cor, popup_rota
+            )
+        ],
+    }
+    folium.GeoJson(
+        rotas_geojson,
+        name='Rotas de Folga',
+        style_function=lambda feature: {
+            'color': feature['properties']['cor'], 'weight': 3, 'opacity': 0.8
+        },
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+    ).add_to(m)
+
+    # Marcadores de destino agrupados (MarkerCluster) a partir de uma lista compacta
+    popup_destino = ("<b>" + colaborador + "</b><br>Destino: " + destino + "<br>Supervisor: " + supervisor
+                     + "<br>Período: " + periodo)
+    destinos = list(zip(
+        pontos['destino_lat'], pontos['destino_lon'], popup_destino,
+        colaborador + " - " + destino, cor.replace(cores_icone)
+    ))
+    FastMarkerCluster(
+        destinos,
+        name='Colaboradores',
+        callback="""
+            function (row) {
+                var icon = L.AwesomeMarkers.icon({icon: 'user', markerColor: row[4], prefix: 'glyphicon'});
+                var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+                marker.bindPopup(row[2]);
+                marker.bindTooltip(row[3]);
+                return marker;
+            };
+        """,
+    ).add_to(m)
+
+    return m
@@ -0,0 +1,91 @@
+"""Tempos e contadores de execução do cronograma, exportáveis em JSON lines.
+
+Um único registro por processo (METRICAS), compartilhado entre sessões e
+threads; guarda apenas os eventos mais recentes.
+"""
+from collections import Counter, deque
+from contextlib import contextmanager
+import functools
+import json
+import threading
+import time
+
+import pandas as pd
+
+LIMITE_EVENTOS = 2000
+
+
+class Metricas:
+    def __init__(self, limite: int = LIMITE_EVENTOS):
+        self.eventos = deque(maxlen=limite)
+        self.contadores = Counter()
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, segundos: float, **dados):
+        evento = {'momento': time.time(), 'nome': nome, 'segundos': segundos, **dados}
+        with self._lock:
+            self.eventos.append(evento)
+
+    def contar(self, nome: str, quantidade: int = 1):
+        with self._lock:
+            self.contadores[nome] += quantidade
+
+    @contextmanager
+    def medir(self, nome: str, **dados):
+        """Mede o bloco; o dicionário retornado recebe dados extras (linhas, bytes, cache...)"""
+        registro = dict(dados)
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        except Exception as e:
+            registro['erro'] = type(e).__name__
+            raise
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio, **registro)
+
+    def cronometrado(self, nome: str, linhas=None):
+        """Decorador de medir; `linhas` recebe os mesmos argumentos da função e retorna a contagem"""
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def medida(*args, **kwargs):
+                with self.medir(nome) as registro:
+                    if linhas is not None:
+                        registro['linhas'] = linhas(*args, **kwargs)
+                    return funcao(*args, **kwargs)
+            return medida
+        return decorador
+
+    def contadores_copia(self) -> dict:
+        """Cópia dos contadores, segura enquanto outras threads contam"""
+        with self._lock:
+            return dict(self.contadores)
+
+    def resumo(self) -> pd.DataFrame:
+        """Chamadas, tempo total, médio e máximo por nome de evento"""
+        with self._lock:
+            eventos = pd.DataFrame(list(self.eventos))
+        if eventos.empty:
+            return pd.DataFrame(columns=['chamadas', 'total_s', 'media_ms', 'max_ms'])
+
+        grupos = eventos.groupby('nome')['segundos']
+        return pd.DataFrame({
+            'chamadas': grupos.size(),
+            'total_s': grupos.sum().round(3),
+            'media_ms': (grupos.mean() * 1000).round(1),
+            'max_ms': (grupos.max() * 1000).round(1),
+        }).sort_values('total_s', ascending=False)
+
+    def exportar_jsonl(self) -> str:
+        """Um evento JSON por linha, seguido dos contadores"""
+        with self._lock:
+            linhas = [json.dumps(evento, ensure_ascii=False, default=str) for evento in self.eventos]
+            linhas.append(json.dumps({'contadores': dict(self.contadores)}, ensure_ascii=False))
+        return "\n".join(linhas) + "\n"
+
+    def limpar(self):
+        with self._lock:
+            self.eventos.clear()
+            self.contadores.clear()
+
+
+METRICAS = Metricas()
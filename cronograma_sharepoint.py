@@ -0,0 +1,323 @@
+"""Acesso às planilhas de folgas no SharePoint via Microsoft Graph."""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple, Union
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import requests
+from msal import ConfidentialClientApplication, SerializableTokenCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cronograma_core import ler_planilha_folgas
+from cronograma_metricas import METRICAS
+
+
+def _acumular_blocos(blocos: Iterable[bytes], limite_memoria: int) -> Tuple[Union[bytes, str], int, str]:
+    """Junta os blocos de um download; retorna (conteudo, tamanho, sha1).
+
+    Em memória até limite_memoria; acima disso, em arquivo temporário (conteudo é o caminho)
+    lido pelo processo de leitura e removido por quem o consome.
+    """
+    em_memoria, tamanho, arquivo = [], 0, None
+    hash_conteudo = hashlib.sha1()
+    try:
+        for bloco in blocos:
+            hash_conteudo.update(bloco)
+            tamanho += len(bloco)
+            if arquivo is None and tamanho > limite_memoria:
+                arquivo = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+                arquivo.writelines(em_memoria)
+                em_memoria = []
+            if arquivo is None:
+                em_memoria.append(bloco)
+            else:
+                arquivo.write(bloco)
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+    conteudo = b''.join(em_memoria) if arquivo is None else arquivo.name
+    return conteudo, tamanho, hash_conteudo.hexdigest()
+
+
+def _ler_conteudo(conteudo: Union[bytes, str]) -> pd.DataFrame:
+    """Lê uma planilha baixada (bytes em memória ou caminho do arquivo temporário)"""
+    if isinstance(conteudo, bytes):
+        conteudo = io.BytesIO(conteudo)
+    return ler_planilha_folgas(conteudo)
+
+
+class SharePointConnector:
+    GRAPH_URL = "https://graph.microsoft.com/v1.0"
+    SITE_PATH = "rezendeenergia.sharepoint.com:/sites/Intranet"
+    NOME_ARQUIVO = "FOLGA DAS EQUIPES GERAL.xlsx"
+    ARQUIVOS = {"GERAL": NOME_ARQUIVO}  # Região -> nome da planilha
+    TIMEOUT = (5, 60)  # (conexão, leitura) em segundos
+    TAMANHO_BLOCO = 1024 * 1024  # Bytes por bloco no download
+    LIMITE_MEMORIA = 16 * 1024 * 1024  # Acima disso o download vai para disco
+    DOWNLOADS_PARALELOS = 8  # Conexões simultâneas ao Graph
+
+    def __init__(self, client_id: str, client_secret: str, tenant_id: str, token_cache_path: str = None,
+                 arquivos: Union[Dict[str, str], List[str]] = None, pasta: str = None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.tenant_id = tenant_id
+
+        # Planilhas por região: dicionário explícito, lista de nomes ou todos os .xlsx de uma pasta
+        if arquivos is None:
+            arquivos = self.ARQUIVOS
+        elif not isinstance(arquivos, dict):
+            arquivos = {os.path.splitext(nome)[0]: nome for nome in arquivos}
+        self.arquivos = dict(arquivos)
+        self.pasta = pasta.strip('/') if pasta else None
+
+        # Token cache serializável, opcionalmente persistido em disco
+        self.token_cache_path = token_cache_path
+        self.token_cache = SerializableTokenCache()
+        if self.token_cache_path and os.path.exists(self.token_cache_path):
+            with open(self.token_cache_path) as arquivo:
+                self.token_cache.deserialize(arquivo.read())
+
+        # Criado na primeira atualização: o MSAL consulta a authority pela rede ao ser construído
+        self.app = None
+
+        # Sessão HTTP keep-alive com novas tentativas para falhas transitórias
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"])
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.DOWNLOADS_PARALELOS)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Tempos por fase da última atualização (segundos); escritos pela thread de atualização
+        self.tempos = {}
+        self._tempos_lock = threading.Lock()
+        self.erro = None
+
+        # Estado da última sincronização, reaproveitado entre atualizações
+        self.site_id = None
+        self.planilhas = {}  # Região -> item_id, etag, ctag, df e versao da planilha
+        self.regioes_indisponiveis = []
+        self.df = None
+        self.versao = None
+        self.downloads = 0
+        self.bytes_baixados = 0
+
+    def get_data(self):
+        with METRICAS.medir('SharePointConnector.get_data') as registro:
+            downloads, bytes_baixados = self.downloads, self.bytes_baixados
+            df, versao = self._obter_dados()
+
+            # Cache hit: nenhuma planilha precisou ser baixada novamente
+            registro.update({
+                'linhas': 0 if df is None else len(df),
+                'downloads': self.downloads - downloads,
+                'bytes': self.bytes_baixados - bytes_baixados,
+                'cache': 'hit' if df is not None and self.downloads == downloads else 'miss',
+                'fases': {fase: round(segundos, 4) for fase, segundos in self.tempos_copia().items()},
+            })
+            if self.erro is not None:
+                registro['erro'] = str(self.erro)
+            return df, versao
+
+    def _obter_dados(self):
+        try:
+            with self._tempos_lock:
+                self.tempos = {}
+            self.erro = None
+            with self._medir('token'):
+                if self.app is None:
+                    self.app = ConfidentialClientApplication(
+                        self.client_id,
+                        authority=f"https://login.microsoftonline.com/{self.tenant_id}",
+                        client_credential=self.client_secret,
+                        token_cache=self.token_cache,
+                    )
+                # O MSAL devolve o token do cache enquanto ele não expira
+                result = self.app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
+                self._salvar_token_cache()
+
+            if "access_token" in result:
+                self.session.headers["Authorization"] = f"Bearer {result['access_token']}"
+                return self.sincronizar()
+            self.erro = result.get("error_description", "token não obtido")
+            return None, None
+        except Exception as e:
+            self.erro = e
+            return None, None
+
+    @contextmanager
+    def _medir(self, fase: str):
+        """Registra a duração de uma fase da sincronização"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._tempos_lock:
+                self.tempos[fase] = time.perf_counter() - inicio
+
+    def tempos_copia(self) -> Dict[str, float]:
+        """Cópia dos tempos por fase, segura durante uma atualização em segundo plano"""
+        with self._tempos_lock:
+            return dict(self.tempos)
+
+    def _salvar_token_cache(self):
+        """Persiste o token cache em disco quando configurado e alterado"""
+        if self.token_cache_path and self.token_cache.has_state_changed:
+            with open(self.token_cache_path, "w") as arquivo:
+                arquivo.write(self.token_cache.serialize())
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, timeout=self.TIMEOUT, **kwargs)
+
+    def _estado(self, regiao: str) -> Dict:
+        return self.planilhas.setdefault(regiao, {
+            'item_id': None, 'etag': None, 'ctag': None, 'df': None, 'versao': None
+        })
+
+    def _listar_pasta(self) -> Dict[str, Dict]:
+        """Metadados de todas as planilhas da pasta em uma única chamada"""
+        url = f"{self.GRAPH_URL}/sites/{self.site_id}/drive/root:/{self.pasta}:/children"
+        response = self._get(url, params={"$select": "id,name,eTag,cTag"})
+        if response.status_code != 200:
+            return {}
+
+        itens = {}
+        for item in response.json().get('value', []):
+            if item['name'].lower().endswith('.xlsx'):
+                regiao = os.path.splitext(item['name'])[0]
+                self._estado(regiao)['item_id'] = item['id']
+                itens[regiao] = item
+        return itens
+
+    def _localizar(self, regiao: str):
+        """Metadados de uma planilha: pelo item já conhecido ou por busca pelo nome"""
+        estado = self._estado(regiao)
+        nome = self.arquivos[regiao]
+
+        if estado['item_id'] is not None:
+            item_url = f"{self.GRAPH_URL}/sites/{self.site_id}/drive/items/{estado['item_id']}"
+            item_response = self._get(item_url, params={"$select": "id,name,eTag,cTag"})
+            if item_response.status_code == 200:
+                return item_response.json()
+            estado['item_id'] = None
+
+        search_url = f"{self.GRAPH_URL}/sites/{self.site_id}/drive/root/search(q='{nome}')"
+        search_response = self._get(search_url)
+        if search_response.status_code != 200:
+            return None
+
+        files_found = search_response.json().get('value', [])
+        item = next((f for f in files_found if f['name'] == nome), None)
+        if item is not None:
+            estado['item_id'] = item['id']
+        return item
+
+    def _baixar(self, regiao: str, item: Dict):
+        """Baixa uma planilha em blocos; retorna None se o conteúdo não mudou ou o download falhou"""
+        estado = self._estado(regiao)
+
+        # Conteúdo inalterado: reaproveitar a última planilha processada
+        if estado['df'] is not None and item.get('cTag') and item.get('cTag') == estado['ctag']:
+            return None
+
+        download_url = f"{self.GRAPH_URL}/sites/{self.site_id}/drive/items/{item['id']}/content"
+        download_headers = {}
+        if estado['df'] is not None and estado['etag']:
+            download_headers["If-None-Match"] = estado['etag']
+        with self._get(download_url, headers=download_headers, stream=True) as download_response:
+            if download_response.status_code == 304:
+                estado['ctag'] = item.get('cTag')
+                return None
+
+            if download_response.status_code != 200:
+                return None
+
+            conteudo, tamanho, hash_conteudo = _acumular_blocos(
+                download_response.iter_content(chunk_size=self.TAMANHO_BLOCO), self.LIMITE_MEMORIA
+            )
+            etag = download_response.headers.get('ETag') or item.get('eTag')
+
+        return {
+            'conteudo': conteudo,
+            'tamanho': tamanho,
+            'etag': etag,
+            'ctag': item.get('cTag'),
+            # Versão da planilha: cTag do SharePoint ou hash do conteúdo
+            'versao': item.get('cTag') or item.get('eTag') or hash_conteudo,
+        }
+
+    def _ler_planilhas(self, baixadas: Dict[str, Dict]) -> Dict[str, pd.DataFrame]:
+        """Lê as planilhas baixadas; com mais de uma, em processos paralelos (leitura do xlsx usa CPU)"""
+        conteudos = [baixada['conteudo'] for baixada in baixadas.values()]
+        processos = min(len(conteudos), os.cpu_count() or 1)
+        try:
+            if processos > 1:
+                # spawn: não copiar por fork um processo com várias threads (Streamlit, atualização em segundo plano)
+                with ProcessPoolExecutor(max_workers=processos,
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    return dict(zip(baixadas, executor.map(_ler_conteudo, conteudos)))
+            return {regiao: _ler_conteudo(conteudo) for regiao, conteudo in zip(baixadas, conteudos)}
+        finally:
+            for conteudo in conteudos:
+                if isinstance(conteudo, str):
+                    os.remove(conteudo)
+
+    def sincronizar(self) -> Tuple:
+        """Baixa apenas as planilhas alteradas desde a última sincronização e combina todas as regiões"""
+        # Obter site_id
+        if self.site_id is None:
+            with self._medir('site'):
+                site_response = self._get(f"{self.GRAPH_URL}/sites/{self.SITE_PATH}")
+            if site_response.status_code != 200:
+                return self.df, self.versao
+            self.site_id = site_response.json()['id']
+
+        with ThreadPoolExecutor(max_workers=self.DOWNLOADS_PARALELOS) as executor:
+            # Consultar metadados (sem baixar o conteúdo)
+            with self._medir('metadados'):
+                if self.pasta:
+                    itens = self._listar_pasta()
+                else:
+                    itens = dict(zip(self.arquivos, executor.map(self._localizar, self.arquivos)))
+                itens = {regiao: item for regiao, item in itens.items() if item is not None}
+
+            # Downloads concorrentes sobre a mesma sessão: o tempo total acompanha o arquivo mais lento
+            with self._medir('download'):
+                baixadas = dict(zip(itens, executor.map(self._baixar, itens, itens.values())))
+                baixadas = {regiao: baixada for regiao, baixada in baixadas.items() if baixada is not None}
+        self.downloads += len(baixadas)
+        self.bytes_baixados += sum(baixada['tamanho'] for baixada in baixadas.values())
+
+        if baixadas:
+            with self._medir('leitura'):
+                lidas = self._ler_planilhas(baixadas)
+            for regiao, df in lidas.items():
+                estado = self._estado(regiao)
+                estado['df'] = df
+                estado.update({chave: baixadas[regiao][chave] for chave in ('etag', 'ctag', 'versao')})
+
+        # Regiões sem nenhuma versão carregada ficam de fora até a próxima sincronização
+        regioes = sorted(itens) if self.pasta else list(self.arquivos)
+        disponiveis = [regiao for regiao in regioes if self._estado(regiao)['df'] is not None]
+        self.regioes_indisponiveis = [regiao for regiao in regioes if regiao not in disponiveis]
+        if not disponiveis:
+            return self.df, self.versao
+
+        versoes = [f"{regiao}:{self.planilhas[regiao]['versao']}" for regiao in disponiveis]
+        versao = self.planilhas[disponiveis[0]]['versao'] if len(versoes) == 1 else \
+            hashlib.sha1("|".join(versoes).encode('utf-8')).hexdigest()
+        if versao != self.versao or self.df is None:
+            self.df = pd.concat(
+                [self.planilhas[regiao]['df'].assign(regiao=regiao) for regiao in disponiveis],
+                ignore_index=True
+            )
+            self.versao = versao
+        return self.df, self.versao
@@ -6,10 +6,21 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
-from typing import Dict, List, Tuple
-import requests
-from msal import ConfidentialClientApplication
+import cProfile
 import io
+import marshal
+import pstats
+import time
+
+from cronograma_core import (
+    CIDADES_LOOKUP, EFETIVO_MINIMO_PADRAO, HORIZONTE_COBERTURA_DIAS, INTERVALO_MINIMO_DIAS,
+    LIMITE_CRITICO_DIAS, TIPOS_INCONSISTENCIA, VISOES_EXPORTACAO, RepositorioCronograma, SnapshotStore,
+    normalizar_cidade
+)
+from cronograma_exportacao import FORMATOS_EXPORTACAO
+from cronograma_mapas import camada_cidades, create_flow_map, create_map
+from cronograma_metricas import METRICAS
+from cronograma_sharepoint import SharePointConnector
 
 # Configuração da página
 st.set_page_config(
@@ -126,461 +137,208 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Coordenadas das principais cidades do Pará
-CIDADES_PARA = {
-    'Belém': {'lat': -1.4558, 'lon': -48.4902},
-    'Ananindeua': {'lat': -1.3656, 'lon': -48.3739},
-    'Santarém': {'lat': -2.4426, 'lon': -54.7085},
-    'Marabá': {'lat': -5.3686, 'lon': -49.1178},
-    'Parauapebas': {'lat': -6.0675, 'lon': -49.9024},
-    'Castanhal': {'lat': -1.2939, 'lon': -47.9261},
-    'Abaetetuba': {'lat': -1.7218, 'lon': -48.8788},
-    'Canaã dos Carajás': {'lat': -6.4969, 'lon': -49.8771},
-    'Marituba': {'lat': -1.3473, 'lon': -48.3439},
-    'Barcarena': {'lat': -1.6155, 'lon': -48.6289},
-    'Altamira': {'lat': -3.2039, 'lon': -52.2094},
-    'Paragominas': {'lat': -2.9977, 'lon': -47.3548},
-    'Tucuruí': {'lat': -3.7661, 'lon': -49.6725},
-    'Bragança': {'lat': -1.0534, 'lon': -46.7655},
-    'Itaituba': {'lat': -4.2761, 'lon': -55.9836},
-    'Oriximiná': {'lat': -1.7653, 'lon': -55.8661},
-    'Redenção': {'lat': -8.0273, 'lon': -50.0305},
-    'Capanema': {'lat': -1.1944, 'lon': -47.1808},
-    'Conceição do Araguaia': {'lat': -8.2578, 'lon': -49.2644},
-    'Tailândia': {'lat': -2.9496, 'lon': -48.3458},
-    'Juruti': {'lat': -2.1440, 'lon': -56.0891},
-    'Vila Gorete': {'lat': -2.4256, 'lon': -55.2365},
-    'Mojui dos Campos': {'lat': -2.6824, 'lon': -54.6418},
-    'Menbeca': {'lat': -2.2196, 'lon': -54.9899},
-    'Barreiras': {'lat': -4.0902, 'lon': -55.6892},
-    'Almeirim': {'lat': -1.5276090427351592, 'lon': -52.577482130144006},
-    'Rurópolis': {'lat': -4.094116299218916, 'lon': -54.91062274171425}
-}
-
-
-class SharePointConnector:
-    def __init__(self):
-        self.client_id = st.secrets["sharepoint"]["client_id"]
-        self.client_secret = st.secrets["sharepoint"]["client_secret"]
-        self.tenant_id = st.secrets["sharepoint"]["tenant_id"]
-
-    @st.cache_data(ttl=300)  # Cache por 5 minutos
-    def get_data(_self):
-        try:
-            app = ConfidentialClientApplication(
-                _self.client_id,
-                authority=f"https://login.microsoftonline.com/{_self.tenant_id}",
-                client_credential=_self.client_secret,
-            )
+# Tabela executiva: fundo da coluna de status pelo indicador e linhas exibidas por página
+CORES_STATUS = {'🔴': '#ffebee', '🟡': '#fff8e1', '🟢': '#e8f5e8', '⚫': '#f5f5f5'}
+LINHAS_POR_PAGINA = [25, 50, 100, 200]
+
+
+@st.cache_resource(show_spinner=False)
+def obter_connector() -> SharePointConnector:
+    """Conector único do processo, para preservar o estado de sincronização"""
+    segredos = st.secrets["sharepoint"]
+    return SharePointConnector(
+        segredos["client_id"],
+        segredos["client_secret"],
+        segredos["tenant_id"],
+        token_cache_path=segredos.get("token_cache_path"),
+        arquivos=segredos.get("arquivos"),
+        pasta=segredos.get("pasta"),
+    )
 
-            result = app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
-            if "access_token" in result:
-                headers = {"Authorization": f"Bearer {result['access_token']}"}
-
-                # Obter site_id
-                site_url = "https://graph.microsoft.com/v1.0/sites/rezendeenergia.sharepoint.com:/sites/Intranet"
-                site_response = requests.get(site_url, headers=headers)
-
-                if site_response.status_code == 200:
-                    site_data = site_response.json()
-                    site_id = site_data['id']
-
-                    # Buscar arquivo
-                    search_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root/search(q='FOLGA DAS EQUIPES GERAL.xlsx')"
-                    search_response = requests.get(search_url, headers=headers)
-
-                    if search_response.status_code == 200:
-                        search_data = search_response.json()
-                        files_found = search_data.get('value', [])
-
-                        for item in files_found:
-                            if item['name'] == 'FOLGA DAS EQUIPES GERAL.xlsx':
-                                download_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/items/{item['id']}/content"
-                                download_response = requests.get(download_url, headers=headers)
-
-                                if download_response.status_code == 200:
-                                    df = pd.read_excel(io.BytesIO(download_response.content))
-                                    return df
-            return None
-        except Exception as e:
-            st.error(f"Erro ao conectar com SharePoint: {e}")
-            return None
-
-
-class CronogramaAnalyzer:
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
-        self.process_data()
-
-    def process_data(self):
-        """Processa e limpa os dados"""
-        # Renomear colunas para padrão
-        column_mapping = {
-            'COLABORADOR': 'colaborador',
-            'INICIO': 'inicio',
-            'TERMINO': 'termino',
-            'BASE/CAMPO': 'base_campo',
-            'ORIGEM': 'origem',
-            'DESTINO': 'destino',
-            'SUPERVISOR': 'supervisor',
-            'MÊS': 'mes'
-        }
-
-        # Usar os nomes atuais das colunas se existirem
-        available_columns = self.df.columns.tolist()
-        for old_name, new_name in column_mapping.items():
-            if old_name in available_columns:
-                self.df.rename(columns={old_name: new_name}, inplace=True)
-            elif len(available_columns) >= len(column_mapping):
-                # Se não encontrar pelo nome, usa a posição
-                idx = list(column_mapping.keys()).index(old_name)
-                if idx < len(available_columns):
-                    self.df.rename(columns={available_columns[idx]: new_name}, inplace=True)
-
-        # Converter datas
-        date_columns = ['inicio', 'termino', 'base_campo']
-        for col in date_columns:
-            if col in self.df.columns:
-                self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
-
-        # Limpar dados vazios
-        self.df = self.df.dropna(subset=['colaborador'])
-
-        # Adicionar coordenadas
-        self.add_coordinates()
-
-    def add_coordinates(self):
-        """Adiciona coordenadas das cidades"""
-
-        def get_coords(cidade):
-            if pd.isna(cidade) or cidade == '':
-                return None, None
-
-            cidade_clean = str(cidade).strip().title()
-            coords = CIDADES_PARA.get(cidade_clean, {'lat': None, 'lon': None})
-            return coords['lat'], coords['lon']
-
-        if 'origem' in self.df.columns:
-            self.df[['origem_lat', 'origem_lon']] = self.df['origem'].apply(
-                lambda x: pd.Series(get_coords(x))
-            )
 
-        if 'destino' in self.df.columns:
-            self.df[['destino_lat', 'destino_lon']] = self.df['destino'].apply(
-                lambda x: pd.Series(get_coords(x))
-            )
+@st.cache_resource(show_spinner=False)
+def obter_repositorio() -> RepositorioCronograma:
+    """Repositório único do processo, compartilhado entre sessões e reruns"""
+    return RepositorioCronograma(obter_connector(), SnapshotStore())
 
-    def format_date_br(self, date_value):
-        """Formatar data para padrão brasileiro (dd/mm/aaaa)"""
-        if pd.isna(date_value):
-            return 'N/A'
-
-        if hasattr(date_value, 'strftime'):
-            return date_value.strftime("%d/%m/%Y")
-
-        return str(date_value)
-
-    def get_status_atual(self) -> Dict:
-        """Retorna status atual das equipes"""
-        hoje = datetime.now().date()
-        status = {
-            'em_folga': [],
-            'ativo': [],
-            'sem_programacao': []
-        }
-
-        for _, row in self.df.iterrows():
-            colaborador = row['colaborador']
-
-            if pd.notna(row.get('inicio')) and pd.notna(row.get('termino')):
-                inicio = row['inicio'].date() if hasattr(row['inicio'], 'date') else row['inicio']
-                termino = row['termino'].date() if hasattr(row['termino'], 'date') else row['termino']
-
-                if inicio <= hoje <= termino:
-                    status['em_folga'].append({
-                        'colaborador': colaborador,
-                        'inicio': self.format_date_br(inicio),
-                        'termino': self.format_date_br(termino),
-                        'origem': row.get('origem', ''),
-                        'destino': row.get('destino', ''),
-                        'supervisor': row.get('supervisor', '')
-                    })
-                else:
-                    status['ativo'].append({
-                        'colaborador': colaborador,
-                        'origem': row.get('origem', ''),
-                        'supervisor': row.get('supervisor', '')
-                    })
-            else:
-                status['sem_programacao'].append({
-                    'colaborador': colaborador,
-                    'supervisor': row.get('supervisor', '')
-                })
 
-        return status
+def modo_admin() -> bool:
+    """Diagnóstico habilitado com ?admin=1 na URL"""
+    return st.query_params.get("admin") == "1"
 
-    def audit_folgas(self) -> List[Dict]:
-        """Audita intervalos entre folgas (mínimo 30 dias)"""
-        problemas = []
 
-        # Agrupar por colaborador
-        colaboradores = self.df['colaborador'].unique()
+def texto_idade(segundos: float) -> str:
+    """Idade dos dados em texto curto (s, min ou h)"""
+    if segundos < 60:
+        return f"{segundos:.0f} s"
+    if segundos < 3600:
+        return f"{segundos / 60:.0f} min"
+    return f"{segundos / 3600:.1f} h"
 
-        for colaborador in colaboradores:
-            folgas_colaborador = self.df[self.df['colaborador'] == colaborador].copy()
-            folgas_colaborador = folgas_colaborador.dropna(subset=['inicio', 'termino'])
 
-            if len(folgas_colaborador) > 1:
-                # Ordenar por data de início
-                folgas_colaborador = folgas_colaborador.sort_values('inicio')
+def estilos_cronograma(dados_folgas: pd.DataFrame, colunas) -> pd.DataFrame:
+    """CSS de cada célula da tabela executiva, calculado a partir dos dias para a folga"""
+    dias = dados_folgas['dias_para_folga'].to_numpy()
+    programada = (dados_folgas['status'] != "SEM_PROGRAMAÇÃO").to_numpy()
 
-                for i in range(len(folgas_colaborador) - 1):
-                    termino_atual = folgas_colaborador.iloc[i]['termino']
-                    inicio_proximo = folgas_colaborador.iloc[i + 1]['inicio']
+    # Linha inteira pela proximidade da folga
+    cor_linha = np.select(
+        [~programada, dias <= 3, dias <= 7],
+        ['background-color: #f8f9fa', 'background-color: #ffebee', 'background-color: #fff3e0'],
+        default=''
+    )
+    estilos = pd.DataFrame(np.repeat(cor_linha[:, None], len(colunas), axis=1), columns=colunas)
+
+    # Coluna de status pelo indicador colorido, quando houver
+    cor_status = dados_folgas['status_cor'].map(CORES_STATUS).to_numpy()
+    estilos['⚡ STATUS'] = np.where(pd.notna(cor_status), 'background-color: ' + cor_status.astype(str), cor_linha)
+    return estilos
+
+
+def configurar_efetivo_minimo(analyzer):
+    """Efetivo mínimo padrão e exceções por base, na sidebar; vale para todas as páginas"""
+    with st.sidebar.expander("⚙️ Efetivo mínimo em serviço por base"):
+        padrao = st.number_input("Mínimo padrão:", min_value=0, value=EFETIVO_MINIMO_PADRAO, step=1,
+                                 key="efetivo_minimo_padrao")
+        efetivo = analyzer.efetivo_por_base()
+        tabela = pd.DataFrame({'base': efetivo.index.astype(str), 'efetivo': efetivo.to_numpy(), 'minimo': padrao})
+        editada = st.data_editor(
+            tabela, hide_index=True, use_container_width=True, disabled=['base', 'efetivo'],
+            column_config={'minimo': st.column_config.NumberColumn("mínimo em serviço", min_value=0, step=1)},
+            key="efetivo_minimo_bases"
+        )
 
-                    if pd.notna(termino_atual) and pd.notna(inicio_proximo):
-                        diferenca = (inicio_proximo - termino_atual).days
+    excecoes = editada[editada['minimo'] != padrao]
+    st.session_state['efetivo_minimo'] = (dict(zip(excecoes['base'], excecoes['minimo'].astype(int))), int(padrao))
 
-                        if diferenca < 30:
-                            problemas.append({
-                                'colaborador': colaborador,
-                                'folga1_termino': self.format_date_br(termino_atual),
-                                'folga2_inicio': self.format_date_br(inicio_proximo),
-                                'dias_intervalo': diferenca,
-                                'supervisor': folgas_colaborador.iloc[i]['supervisor']
-                            })
 
-        return problemas
+def efetivo_minimo_configurado():
+    """(minimos por base, mínimo padrão) definidos na sidebar"""
+    return st.session_state.get('efetivo_minimo', ({}, EFETIVO_MINIMO_PADRAO))
 
 
-def create_map(df: pd.DataFrame) -> folium.Map:
-    """Cria mapa com as movimentações das equipes"""
-    # Centro do Pará
-    m = folium.Map(
-        location=[-3.7, -52.0],
-        zoom_start=6,
-        tiles='OpenStreetMap'
-    )
+def texto_efetivo(verificacao: pd.DataFrame) -> pd.Series:
+    """'✅ 5/8 em serviço' por folga futura; '—' nas demais linhas"""
+    icone = verificacao['atende'].map({True: "✅ ", False: "⚠️ "})
+    texto = (verificacao['em_servico'].astype('Int64').astype(str) + "/"
+             + verificacao['efetivo'].astype('Int64').astype(str) + " em serviço")
+    return (icone + texto).fillna("—")
+
 
-    # Adicionar cidades base
-    for cidade, coords in CIDADES_PARA.items():
-        folium.Marker(
-            location=[coords['lat'], coords['lon']],
-            popup=f"<b>{cidade}</b><br>Base Operacional",
-            tooltip=cidade,
-            icon=folium.Icon(color='orange', icon='home')
-        ).add_to(m)
-
-        # Adicionar rotas de folga
-    colors = ['#F7931E', '#000000', 'red', 'green', 'purple', 'orange', 'darkred', 'lightred',
-              'beige', 'darkblue', 'darkgreen', 'cadetblue', 'darkpurple',
-              'white', 'pink', 'lightblue', 'lightgreen', 'gray', 'lightgray']
-
-    for idx, (_, row) in enumerate(df.iterrows()):
-        if (pd.notna(row.get('origem_lat')) and pd.notna(row.get('origem_lon')) and
-                pd.notna(row.get('destino_lat')) and pd.notna(row.get('destino_lon'))):
-            color = colors[idx % len(colors)]
-
-            # Linha da rota
-            folium.PolyLine(
-                locations=[
-                    [row['origem_lat'], row['origem_lon']],
-                    [row['destino_lat'], row['destino_lon']]
-                ],
-                color=color,
-                weight=3,
-                opacity=0.8,
-                popup=f"<b>{row['colaborador']}</b><br>"
-                      f"De: {row.get('origem', 'N/A')}<br>"
-                      f"Para: {row.get('destino', 'N/A')}<br>"
-                      f"Período: {row.get('inicio', 'N/A')} - {row.get('termino', 'N/A')}"
-            ).add_to(m)
-
-            # Marcador de destino
-            folium.Marker(
-                location=[row['destino_lat'], row['destino_lon']],
-                popup=f"<b>{row['colaborador']}</b><br>"
-                      f"Destino: {row.get('destino', 'N/A')}<br>"
-                      f"Supervisor: {row.get('supervisor', 'N/A')}<br>"
-                      f"Período: {row.get('inicio', 'N/A')} - {row.get('termino', 'N/A')}",
-                tooltip=f"{row['colaborador']} - {row.get('destino', 'N/A')}",
-                icon=folium.Icon(color=color, icon='user')
-            ).add_to(m)
-
-    return m
-
-
-def show_cronograma_encarregado(analyzer):
+@METRICAS.cronometrado('show_cronograma_encarregado', linhas=lambda analyzer, *args, **kwargs: len(analyzer.df))
+def show_cronograma_encarregado(analyzer, data_referencia=None):
     """Página executiva mostrando cronograma ordenado por proximidade de folga"""
+    if data_referencia is None:
+        data_referencia = datetime.now().date()
 
     # Botão de atualização no topo
-    col1, col2 = st.columns([3, 1])
+    col1, col_efetivo, col2 = st.columns([2, 2, 1])
 
     with col2:
         if st.button("🔄 Atualizar Dados", type="primary"):
-            st.cache_data.clear()  # Limpa o cache
+            with st.spinner("Consultando o SharePoint..."):
+                obter_repositorio().atualizar()  # Atualiza apenas os dados do cronograma
             st.rerun()  # Recarrega a página
 
-    # Calcular dados para dashboard
-    hoje = datetime.now().date()
-    dados_folgas = []
-
-    for _, row in analyzer.df.iterrows():
-        colaborador = row['colaborador']
-        supervisor = row.get('supervisor', 'N/A')
-        destino = row.get('destino', 'N/A')
-        origem = row.get('origem', 'N/A')
-
-        if pd.notna(row.get('inicio')):
-            inicio = row['inicio'].date() if hasattr(row['inicio'], 'date') else row['inicio']
-            termino = row['termino'].date() if hasattr(row['termino'], 'date') else row['termino']
-
-            # Se já voltou da folga (termino < hoje), não incluir na tabela
-            if termino < hoje:
-                continue
+    with col1:
+        em_folga = analyzer.indice_folgas.em_folga_em(data_referencia)
+        st.metric(f"🏖️ Em folga em {data_referencia.strftime('%d/%m/%Y')}", em_folga['colaborador'].nunique())
 
-            dias_para_folga = (inicio - hoje).days
-            duracao = (termino - inicio).days + 1
+    # Calcular dados para dashboard
+    dados_folgas = analyzer.get_status_atual(data_referencia)
 
-            # Determinar status
-            if dias_para_folga <= 0:
-                if termino >= hoje:
-                    status = "EM_FOLGA"
-                    status_cor = "🟢"
-                    dias_para_folga = 0
-                    prioridade = 2  # Em folga tem prioridade 2
-                else:
-                    continue  # Não deveria chegar aqui devido ao filtro acima
-            elif dias_para_folga <= 7:
-                status = "URGENTE"
-                status_cor = "🔴"
-                prioridade = 1  # Urgente tem prioridade 1 (mais alta)
-            elif dias_para_folga <= 15:
-                status = "ATENÇÃO"
-                status_cor = "🟡"
-                prioridade = 3
-            elif dias_para_folga <= 30:
-                status = "PROGRAMADO"
-                status_cor = "🟢"
-                prioridade = 4
-            else:
-                status = "DISTANTE"
-                status_cor = "🔵"
-                prioridade = 5
-
-            dados_folgas.append({
-                'colaborador': colaborador,
-                'supervisor': supervisor,
-                'destino': destino,
-                'origem': origem,
-                'inicio': inicio,
-                'termino': termino,
-                'dias_para_folga': dias_para_folga,
-                'duracao': duracao,
-                'status': status,
-                'status_cor': status_cor,
-                'prioridade': prioridade
-            })
-        else:
-            # Sem programação
-            dados_folgas.append({
-                'colaborador': colaborador,
-                'supervisor': supervisor,
-                'destino': 'N/A',
-                'origem': origem,
-                'inicio': None,
-                'termino': None,
-                'dias_para_folga': 999,  # Colocar no final
-                'duracao': 0,
-                'status': "SEM_PROGRAMAÇÃO",
-                'status_cor': "⚫",
-                'prioridade': 6
-            })
-
-    # Ordenar por prioridade (urgência) e depois por dias para folga
-    dados_folgas = sorted(dados_folgas, key=lambda x: (x['prioridade'], x['dias_para_folga']))
+    # Efetivo da base de origem durante cada folga futura
+    minimos, efetivo_minimo = efetivo_minimo_configurado()
+    verificacao = analyzer.verificar_efetivo(data_referencia, minimos, efetivo_minimo)
+    with col_efetivo:
+        st.metric("🏢 Folgas que deixam a base abaixo do mínimo", int((~verificacao['atende'].astype(bool)).sum()),
+                  help="Colaboradores da mesma base ausentes no período, contra o mínimo em serviço configurado")
 
     # TABELA EXECUTIVA
     st.subheader("📊 Cronograma Detalhado - Ordenado por Urgência")
 
-    if dados_folgas:
+    if not dados_folgas.empty:
+        # Paginação: apenas a fatia visível é formatada, estilizada e enviada ao navegador
+        col_pagina, col_tamanho, col_total = st.columns([1, 1, 2])
+        with col_tamanho:
+            por_pagina = st.selectbox("Linhas por página", LINHAS_POR_PAGINA, index=1)
+        total_paginas = max(1, -(-len(dados_folgas) // por_pagina))
+        with col_pagina:
+            pagina = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1)
+        with col_total:
+            st.caption(f"{len(dados_folgas)} colaboradores | página {pagina} de {total_paginas}")
+
+        inicio = (pagina - 1) * por_pagina
+        dados_folgas = dados_folgas.iloc[inicio:inicio + por_pagina]
+        programada = dados_folgas['status'] != "SEM_PROGRAMAÇÃO"
+
         # Criar DataFrame para exibição
-        df_display = pd.DataFrame([{
-            '👤 COLABORADOR': dado['colaborador'],
-            '🎯 DIAS PARA FOLGA': dado['dias_para_folga'] if dado['dias_para_folga'] != 999 else 'N/A',
-            '📅 INÍCIO': analyzer.format_date_br(dado['inicio']) if dado['inicio'] else 'N/A',
-            '📅 FIM': analyzer.format_date_br(dado['termino']) if dado['termino'] else 'N/A',
-            '⏱️ DURAÇÃO': f"{dado['duracao']} dias" if dado['duracao'] > 0 else 'N/A',
-            '🏠 ORIGEM': dado['origem'],
-            '🏙️ DESTINO': dado['destino'],
-            '👨‍💼 SUPERVISOR': dado['supervisor'],
-            '⚡ STATUS': f"{dado['status_cor']} {dado['status']}"
-        } for dado in dados_folgas])
-
-        # Aplicar estilo baseado no status
-        def color_status(val):
-            if '🔴' in str(val):
-                return 'background-color: #ffebee'
-            elif '🟡' in str(val):
-                return 'background-color: #fff8e1'
-            elif '🟢' in str(val):
-                return 'background-color: #e8f5e8'
-            elif '⚫' in str(val):
-                return 'background-color: #f5f5f5'
-            return ''
-
-        # Colorir linha inteira baseado nos dias para folga
-        def highlight_urgency(row):
-            dias = row['🎯 DIAS PARA FOLGA']
-            if dias == 'N/A':
-                return ['background-color: #f8f9fa'] * len(row)
-            elif isinstance(dias, (int, float)) and dias <= 3:
-                return ['background-color: #ffebee'] * len(row)
-            elif isinstance(dias, (int, float)) and dias <= 7:
-                return ['background-color: #fff3e0'] * len(row)
-            else:
-                return [''] * len(row)
-
-        styled_df = df_display.style.apply(highlight_urgency, axis=1) \
-            .applymap(color_status, subset=['⚡ STATUS'])
-
-        st.dataframe(styled_df, use_container_width=True, height=600)
+        df_display = pd.DataFrame({
+            '👤 COLABORADOR': dados_folgas['colaborador'],
+            '🎯 DIAS PARA FOLGA': dados_folgas['dias_para_folga'].astype(object).where(programada, 'N/A'),
+            '📅 INÍCIO': dados_folgas['inicio'].dt.strftime("%d/%m/%Y").fillna('N/A'),
+            '📅 FIM': dados_folgas['termino'].dt.strftime("%d/%m/%Y").fillna('N/A'),
+            '⏱️ DURAÇÃO': (dados_folgas['duracao'].astype(str) + " dias").where(dados_folgas['duracao'] > 0, 'N/A'),
+            '🏠 ORIGEM': dados_folgas['origem'],
+            '🏙️ DESTINO': dados_folgas['destino'],
+            '👨‍💼 SUPERVISOR': dados_folgas['supervisor'],
+            '⚡ STATUS': dados_folgas['status_cor'] + " " + dados_folgas['status'],
+            '🏢 EFETIVO NA BASE': texto_efetivo(verificacao.reindex(dados_folgas.index)),
+        }).reset_index(drop=True)
+
+        # Estilo calculado de uma vez para toda a fatia (sem funções Python por linha ou célula)
+        estilos = estilos_cronograma(dados_folgas, df_display.columns)
+        abaixo_do_minimo = verificacao['atende'].reindex(dados_folgas.index).eq(False).to_numpy()
+        estilos.loc[abaixo_do_minimo, '🏢 EFETIVO NA BASE'] = 'background-color: #ffcdd2'
+        df_display.index = estilos.index = pd.RangeIndex(inicio, inicio + len(df_display))
+        with METRICAS.medir('tabela_executiva', linhas=len(df_display)):
+            styled_df = df_display.style.apply(lambda _: estilos, axis=None)
+            st.dataframe(styled_df, use_container_width=True, height=600)
 
     else:
         st.warning("Nenhum dado encontrado.")
 
 
-def show_map_page(analyzer):
+@METRICAS.cronometrado('show_map_page', linhas=lambda analyzer, *args, **kwargs: len(analyzer.df))
+def show_map_page(analyzer, data_referencia=None):
     st.header("🗺️ Mapa das Equipes")
 
-    # Filtros
+    # Filtros a partir do índice pré-calculado (supervisor restringe a lista de colaboradores)
+    indice = analyzer.indice_equipes
     col1, col2 = st.columns(2)
 
     with col1:
-        supervisores = ['Todos'] + list(analyzer.df['supervisor'].dropna().unique())
-        supervisor_filtro = st.selectbox("Filtrar por Supervisor:", supervisores)
+        supervisor_filtro = st.selectbox("Filtrar por Supervisor:", ['Todos'] + indice.supervisores)
 
     with col2:
-        colaboradores = ['Todos'] + list(analyzer.df['colaborador'].dropna().unique())
-        colaborador_filtro = st.selectbox("Filtrar por Colaborador:", colaboradores)
-
-    # Aplicar filtros
-    df_filtered = analyzer.df.copy()
+        colaboradores = indice.colaboradores(None if supervisor_filtro == 'Todos' else supervisor_filtro)
+        colaborador_filtro = st.selectbox("Filtrar por Colaborador:", ['Todos'] + colaboradores)
+
+    # Na visão geral, as rotas podem ser agrupadas por origem → destino
+    agrupar_fluxos = False
+    if colaborador_filtro == 'Todos':
+        agrupar_fluxos = st.toggle("🔀 Agrupar rotas por origem → destino", value=True)
+
+    # Aplicar filtros: fatias pelas posições do índice, sem copiar a tabela inteira
+    posicoes = indice.posicoes(
+        None if supervisor_filtro == 'Todos' else supervisor_filtro,
+        None if colaborador_filtro == 'Todos' else colaborador_filtro,
+    )
 
-    if supervisor_filtro != 'Todos':
-        df_filtered = df_filtered[df_filtered['supervisor'] == supervisor_filtro]
+    if data_referencia is not None and st.checkbox(
+            f"Mostrar apenas quem está em folga em {data_referencia.strftime('%d/%m/%Y')}"):
+        em_folga = analyzer.indice_folgas.em_folga_em(data_referencia)
+        posicoes_folga = np.sort(analyzer.df.index.get_indexer(em_folga.index))
+        posicoes = posicoes_folga if posicoes is None else np.intersect1d(posicoes, posicoes_folga)
 
-    if colaborador_filtro != 'Todos':
-        df_filtered = df_filtered[df_filtered['colaborador'] == colaborador_filtro]
+    df_filtered = analyzer.df if posicoes is None else analyzer.df.iloc[posicoes]
 
     # Mostrar resumo se colaborador específico foi selecionado
     if colaborador_filtro != 'Todos':
         st.subheader(f"📋 Resumo: {colaborador_filtro}")
 
-        colaborador_data = df_filtered[df_filtered['colaborador'] == colaborador_filtro]
-
-        if not colaborador_data.empty:
-            for idx, (_, row) in enumerate(colaborador_data.iterrows()):
+        if not df_filtered.empty:
+            for idx, (_, row) in enumerate(df_filtered.iterrows()):
                 with st.expander(f"Programação {idx + 1}"):
                     col1, col2, col3 = st.columns(3)
 
@@ -622,15 +380,14 @@ def show_map_page(analyzer):
 
     # Criar e exibir mapa
     if not df_filtered.empty:
+        inicio_mapa = time.perf_counter()
+
         # Lógica para mostrar apenas cidades relevantes quando filtrar colaborador
         if colaborador_filtro != 'Todos':
             # Coletar cidades origem e destino do colaborador filtrado
-            cidades_relevantes = set()
-            for _, row in df_filtered.iterrows():
-                if pd.notna(row.get('origem')):
-                    cidades_relevantes.add(str(row['origem']).strip().title())
-                if pd.notna(row.get('destino')):
-                    cidades_relevantes.add(str(row['destino']).strip().title())
+            cidades = pd.unique(pd.concat([df_filtered['origem'], df_filtered['destino']]).dropna())
+            chaves = pd.Index([normalizar_cidade(cidade) for cidade in cidades]).unique()
+            cidades_relevantes = CIDADES_LOOKUP.loc[chaves.intersection(CIDADES_LOOKUP.index)]
 
             # Criar mapa personalizado
             mapa = folium.Map(
@@ -640,15 +397,7 @@ def show_map_page(analyzer):
             )
 
             # Adicionar apenas cidades relevantes
-            for cidade in cidades_relevantes:
-                if cidade in CIDADES_PARA:
-                    coords = CIDADES_PARA[cidade]
-                    folium.Marker(
-                        location=[coords['lat'], coords['lon']],
-                        popup=f"<b>{cidade}</b><br>Base Operacional",
-                        tooltip=cidade,
-                        icon=folium.Icon(color='orange', icon='home')
-                    ).add_to(mapa)
+            camada_cidades(set(cidades_relevantes['nome'])).add_to(mapa)
 
             # Adicionar rotas do colaborador
             colors = ['#F7931E', '#000000', 'red', 'green', 'purple']
@@ -689,17 +438,33 @@ def show_map_page(analyzer):
                         tooltip=f"{row['colaborador']} - {row.get('destino', 'N/A')}",
                         icon=folium.Icon(color=color, icon='user')
                     ).add_to(mapa)
+        elif agrupar_fluxos:
+            mapa = create_flow_map(df_filtered)
         else:
             # Usar função original para visão geral
             mapa = create_map(df_filtered)
+        tempo_montagem_ms = (time.perf_counter() - inicio_mapa) * 1000
+
+        inicio_exibicao = time.perf_counter()
+        with METRICAS.medir('st_folium', linhas=len(df_filtered)):
+            st_folium(mapa, width=1000, height=600)
+        tempo_exibicao_ms = (time.perf_counter() - inicio_exibicao) * 1000
 
-        st_folium(mapa, width=1000, height=600)
+        legenda_mapa = (f"🗺️ Mapa montado em {tempo_montagem_ms:.0f} ms, "
+                        f"renderizado e enviado em {tempo_exibicao_ms:.0f} ms")
+        # Tamanho do HTML exige uma segunda renderização: só no modo de diagnóstico
+        if modo_admin():
+            legenda_mapa += f" ({len(mapa.get_root().render()) / 1024:.0f} KB de HTML)"
+        st.caption(legenda_mapa)
 
         # Legenda
         if colaborador_filtro != 'Todos':
             st.info(
                 "💡 **Legenda:** 🏠 Laranja = Bases Origem/Destino do colaborador | 👤 Colorido = Destino da folga | "
                 "Linhas coloridas = Rota da movimentação")
+        elif agrupar_fluxos:
+            st.info("💡 **Legenda:** 🏠 Laranja = Bases Operacionais | "
+                    "Espessura da linha = número de movimentações entre as cidades")
         else:
             st.info("💡 **Legenda:** 🏠 Laranja = Bases Operacionais | 👤 Colorido = Colaboradores em destino | "
                     "Linhas coloridas = Rotas de movimentação")
@@ -707,69 +472,204 @@ def show_map_page(analyzer):
         st.warning("Nenhum dado encontrado para os filtros selecionados.")
 
 
-def show_audit_page(analyzer):
+@METRICAS.cronometrado('show_audit_page', linhas=lambda analyzer, *args, **kwargs: len(analyzer.df))
+def show_audit_page(analyzer, intervalo_minimo: int = INTERVALO_MINIMO_DIAS,
+                    limite_critico: int = LIMITE_CRITICO_DIAS, data_referencia=None):
     st.header("🔍 Auditoria de Folgas")
 
-    st.info("📋 **Regra:** Deve haver pelo menos 30 dias de intervalo entre uma folga e outra.")
+    st.info(f"📋 **Regra:** Deve haver pelo menos {intervalo_minimo} dias de intervalo entre uma folga e outra.")
 
-    problemas = analyzer.audit_folgas()
+    problemas = analyzer.audit_folgas(intervalo_minimo, limite_critico)
 
-    if problemas:
+    if not problemas.empty:
         st.error(f"⚠️ Encontrados {len(problemas)} problema(s) de conformidade:")
 
-        for i, problema in enumerate(problemas, 1):
-            with st.expander(f"Problema {i}: {problema['colaborador']} - {problema['dias_intervalo']} dias"):
+        for i, problema in enumerate(problemas.itertuples(index=False), 1):
+            with st.expander(f"Problema {i}: {problema.colaborador} - {problema.dias_intervalo} dias"):
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.write("**Primeira Folga (Término):**")
-                    st.write(problema['folga1_termino'])
+                    st.write(analyzer.format_date_br(problema.folga1_termino))
 
                 with col2:
                     st.write("**Segunda Folga (Início):**")
-                    st.write(problema['folga2_inicio'])
+                    st.write(analyzer.format_date_br(problema.folga2_inicio))
 
-                st.write(f"**Supervisor:** {problema['supervisor']}")
-                st.write(f"**Intervalo:** {problema['dias_intervalo']} dias")
+                st.write(f"**Supervisor:** {problema.supervisor}")
+                st.write(f"**Intervalo:** {problema.dias_intervalo} dias")
 
-                if problema['dias_intervalo'] < 15:
-                    st.error("🚨 Crítico: Menos de 15 dias de intervalo")
-                elif problema['dias_intervalo'] < 30:
-                    st.warning("⚠️ Atenção: Menos de 30 dias de intervalo")
+                if problema.critico:
+                    st.error(f"🚨 Crítico: Menos de {limite_critico} dias de intervalo")
+                else:
+                    st.warning(f"⚠️ Atenção: Menos de {intervalo_minimo} dias de intervalo")
     else:
-        st.success("✅ Todas as folgas estão em conformidade com a regra de 30 dias!")
+        st.success(f"✅ Todas as folgas estão em conformidade com a regra de {intervalo_minimo} dias!")
+
+    # Consistência das linhas da planilha, agrupada por tipo
+    st.subheader("🧪 Consistência da Planilha")
+    inconsistencias = analyzer.validar_folgas()
+
+    if inconsistencias.empty:
+        st.success("✅ Nenhuma sobreposição, duplicata, período invertido ou data faltante encontrada.")
+    else:
+        contagem = inconsistencias['tipo'].value_counts(sort=False)
+        colunas = st.columns(len(TIPOS_INCONSISTENCIA))
+        for coluna, (tipo, icone, _) in zip(colunas, TIPOS_INCONSISTENCIA):
+            coluna.metric(f"{icone} {tipo.replace('_', ' ').title()}", int(contagem.get(tipo, 0)))
+
+        datas = ['inicio', 'termino', 'base_campo']
+        for tipo, icone, descricao in TIPOS_INCONSISTENCIA:
+            grupo = inconsistencias[inconsistencias['tipo'] == tipo]
+            if grupo.empty:
+                continue
+            with st.expander(f"{icone} {descricao} ({len(grupo)})"):
+                exibicao = grupo.drop(columns='tipo').dropna(axis=1, how='all')
+                exibicao = exibicao.assign(**{
+                    coluna: exibicao[coluna].dt.strftime("%d/%m/%Y") for coluna in datas if coluna in exibicao
+                })
+                st.dataframe(exibicao, use_container_width=True, hide_index=True)
+
+    # Cidades da planilha sem coordenadas cadastradas
+    if not analyzer.cidades_nao_encontradas.empty:
+        with st.expander(f"🏙️ {len(analyzer.cidades_nao_encontradas)} cidade(s) sem coordenadas na planilha"):
+            st.dataframe(analyzer.cidades_nao_encontradas, use_container_width=True)
 
     # Estatísticas de auditoria
     st.subheader("📊 Estatísticas de Auditoria")
 
-    if problemas:
+    if not problemas.empty:
         col1, col2, col3 = st.columns(3)
 
         with col1:
             st.metric("Total de Problemas", len(problemas))
 
         with col2:
-            criticos = len([p for p in problemas if p['dias_intervalo'] < 15])
-            st.metric("Casos Críticos", criticos)
+            st.metric("Casos Críticos", int(problemas['critico'].sum()))
+
+        with col3:
+            st.metric("Intervalo Médio", f"{problemas['dias_intervalo'].mean():.1f} dias")
+
+    # Proposta automática de novas datas
+    st.subheader("🛠️ Proposta de Ajuste Automático")
 
+    if st.toggle("Gerar proposta de novas datas para as folgas futuras"):
+        st.caption("Efetivo mínimo por base conforme a configuração na barra lateral.")
+        minimos, efetivo_minimo = efetivo_minimo_configurado()
+        proposta, resumo = analyzer.propor_ajustes(
+            data_referencia or datetime.now().date(), intervalo_minimo, efetivo_minimo, minimos
+        )
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Violações do intervalo", resumo['violacoes_depois'],
+                      delta=resumo['violacoes_depois'] - resumo['violacoes_antes'], delta_color="inverse")
+        with col2:
+            st.metric("Dias com base abaixo do mínimo", resumo['dias_abaixo_minimo_depois'],
+                      delta=resumo['dias_abaixo_minimo_depois'] - resumo['dias_abaixo_minimo_antes'],
+                      delta_color="inverse")
         with col3:
-            intervalo_medio = sum([p['dias_intervalo'] for p in problemas]) / len(problemas)
-            st.metric("Intervalo Médio", f"{intervalo_medio:.1f} dias")
+            st.metric("Folgas alteradas", resumo['folgas_alteradas'],
+                      help=f"{resumo['dias_deslocados']} dias deslocados no total")
 
+        alteradas = proposta[proposta['deslocamento_dias'] != 0]
+        if alteradas.empty:
+            st.success("✅ Nenhuma folga futura precisa ser alterada.")
+        else:
+            datas = ['inicio', 'termino', 'inicio_proposto', 'termino_proposto']
+            exibicao = alteradas.assign(**{coluna: alteradas[coluna].dt.strftime("%d/%m/%Y") for coluna in datas})
+            st.dataframe(exibicao, use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Baixar Proposta (CSV)",
+                data=exibicao.to_csv(index=False).encode('utf-8'),
+                file_name=f"proposta_folgas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
 
-def show_reports_page(analyzer):
+        if resumo['dias_abaixo_minimo_depois'] > resumo['dias_abaixo_minimo_antes']:
+            st.warning("⚠️ A proposta deixa as bases abaixo do efetivo mínimo por mais dias que o cronograma atual.")
+        if resumo['violacoes_depois']:
+            st.info("ℹ️ As violações restantes envolvem folgas já iniciadas, que não são alteradas, ou colaboradores "
+                    "cujo ajuste deixaria a base abaixo do efetivo mínimo.")
+
+
+def show_coverage_report(analyzer, data_referencia):
+    """Linha do tempo de ausências por base nos próximos dias"""
+    st.subheader(f"📆 Cobertura das Bases - Próximos {HORIZONTE_COBERTURA_DIAS} dias")
+
+    minimos, efetivo_minimo = efetivo_minimo_configurado()
+
+    ausentes = analyzer.cobertura_por_base(data_referencia)
+    if ausentes.empty:
+        st.info("Nenhuma base com colaboradores programados.")
+        return
+
+    efetivo = analyzer.efetivo_por_base().reindex(ausentes.index)
+    em_servico = ausentes.rsub(efetivo, axis=0)
+    minimo = analyzer.minimos_por_base(minimos, efetivo_minimo).reindex(ausentes.index)
+    abaixo_minimo = em_servico.lt(minimo, axis=0)
+
+    fig = go.Figure(go.Heatmap(
+        z=ausentes.to_numpy(),
+        x=ausentes.columns,
+        y=ausentes.index.astype(str),
+        customdata=em_servico.to_numpy(),
+        text=np.where(abaixo_minimo.to_numpy(), "⚠️", ""),
+        texttemplate="%{text}",
+        colorscale=[[0, '#ffffff'], [0.5, '#F7931E'], [1, '#000000']],
+        colorbar={'title': 'Ausentes'},
+        hovertemplate="%{y} - %{x|%d/%m/%Y}<br>Ausentes: %{z}<br>Em serviço: %{customdata}<extra></extra>",
+    ))
+    fig.update_layout(
+        title="Colaboradores ausentes por base (⚠️ = abaixo do efetivo mínimo)",
+        height=max(300, 28 * len(ausentes) + 120),
+        xaxis={'tickformat': '%d/%m'},
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    dias_criticos = abaixo_minimo.sum(axis=1)
+    dias_criticos = dias_criticos[dias_criticos > 0]
+    if not dias_criticos.empty:
+        primeiro_dia = abaixo_minimo.loc[dias_criticos.index].idxmax(axis=1)
+        st.warning(f"⚠️ {len(dias_criticos)} base(s) ficam abaixo do efetivo mínimo no período:")
+        st.dataframe(pd.DataFrame({
+            'Base': dias_criticos.index,
+            'Efetivo': efetivo.loc[dias_criticos.index].to_numpy(),
+            'Dias abaixo do mínimo': dias_criticos.to_numpy(),
+            'Primeiro dia': primeiro_dia.dt.strftime("%d/%m/%Y").to_numpy(),
+        }), use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ Todas as bases mantêm o efetivo mínimo no período.")
+
+
+@METRICAS.cronometrado('show_reports_page', linhas=lambda analyzer, *args, **kwargs: len(analyzer.df))
+def show_reports_page(analyzer, data_referencia=None):
     st.header("📊 Relatórios")
 
+    data_referencia = data_referencia or datetime.now().date()
+
+    # Todos os relatórios abaixo fatiam o cubo pré-agregado (um por versão dos dados e data)
+    cubo = analyzer.cubo_folgas(data_referencia)
+    celulas = cubo.celulas
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        supervisores = st.multiselect("👨‍💼 Supervisores:", sorted(celulas['supervisor'].dropna().unique()))
+    with col2:
+        origens_filtro = st.multiselect("🏠 Bases de origem:", sorted(celulas['origem'].dropna().unique()))
+    with col3:
+        status_filtro = st.multiselect("⚡ Status:", list(celulas['status'].cat.categories))
+    filtros = {'supervisor': supervisores, 'origem': origens_filtro, 'status': status_filtro}
+
     # Relatório por supervisor
     st.subheader("👨‍💼 Relatório por Supervisor")
 
-    supervisor_stats = analyzer.df.groupby('supervisor').agg({
-        'colaborador': 'count',
-        'origem': lambda x: x.nunique(),
-        'destino': lambda x: x.nunique()
-    }).reset_index()
+    supervisor_stats = cubo.totais('supervisor', **filtros).join([
+        cubo.distintos('supervisor', 'origem', **filtros).rename('origens'),
+        cubo.distintos('supervisor', 'destino', **filtros).rename('destinos'),
+    ]).reset_index()
 
-    supervisor_stats.columns = ['Supervisor', 'Colaboradores', 'Origens', 'Destinos']
+    supervisor_stats.columns = ['Supervisor', 'Folgas', 'Dias de Folga', 'Origens', 'Destinos']
     st.dataframe(supervisor_stats, use_container_width=True)
 
     # Gráfico de distribuição
@@ -777,13 +677,35 @@ def show_reports_page(analyzer):
         fig = px.bar(
             supervisor_stats,
             x='Supervisor',
-            y='Colaboradores',
-            title='Distribuição de Colaboradores por Supervisor',
-            color='Colaboradores',
+            y='Folgas',
+            title='Distribuição de Folgas por Supervisor',
+            color='Dias de Folga',
             color_continuous_scale=[[0, '#000000'], [1, '#F7931E']]
         )
         st.plotly_chart(fig, use_container_width=True)
 
+    # Dias de folga por mês e por base
+    st.subheader("📅 Dias de Folga por Mês")
+
+    por_mes = cubo.totais(['mes', 'status'], **filtros).reset_index()
+    por_mes = por_mes[por_mes['dias_folga'] > 0]
+    if not por_mes.empty:
+        fig = px.bar(
+            por_mes,
+            x='mes',
+            y='dias_folga',
+            color='status',
+            title='Dias de folga por mês e status',
+            labels={'mes': 'Mês', 'dias_folga': 'Dias de folga', 'status': 'Status'}
+        )
+        fig.update_layout(xaxis={'tickformat': '%m/%Y'})
+        st.plotly_chart(fig, use_container_width=True)
+
+        por_base = cubo.tabela('origem', 'mes', **filtros)
+        por_base.columns = por_base.columns.strftime('%m/%Y')
+        st.write("**Dias de folga por base e mês:**")
+        st.dataframe(por_base, use_container_width=True)
+
     # Relatório de movimentações por cidade
     st.subheader("🏙️ Movimentações por Cidade")
 
@@ -791,27 +713,81 @@ def show_reports_page(analyzer):
 
     with col1:
         st.write("**Origens mais frequentes:**")
-        origens = analyzer.df['origem'].value_counts().head(10)
+        origens = cubo.totais('origem', **filtros)['folgas'].nlargest(10)
         if not origens.empty:
             st.bar_chart(origens)
 
     with col2:
         st.write("**Destinos mais frequentes:**")
-        destinos = analyzer.df['destino'].value_counts().head(10)
+        destinos = cubo.totais('destino', **filtros)['folgas'].nlargest(10)
         if not destinos.empty:
             st.bar_chart(destinos)
 
-    # Exportar dados
+    # Cobertura das bases ao longo do tempo
+    show_coverage_report(analyzer, data_referencia)
+
+    # Exportar dados: arquivo da seleção atual gerado em blocos uma vez; o último por visão e formato fica guardado
     st.subheader("💾 Exportar Dados")
 
-    if st.button("📥 Baixar Relatório Completo (CSV)"):
-        csv = analyzer.df.to_csv(index=False)
+    col1, col2 = st.columns(2)
+    with col1:
+        visao = st.selectbox("Conteúdo:", list(VISOES_EXPORTACAO), format_func=VISOES_EXPORTACAO.get,
+                             help="O cronograma segue os filtros de supervisor, base e status acima")
+    with col2:
+        formato = st.selectbox("Formato:", list(FORMATOS_EXPORTACAO), format_func=str.upper)
+
+    extensao, mime = FORMATOS_EXPORTACAO[formato]
+    with st.spinner("Gerando arquivo..."):
+        conteudo = analyzer.exportar(visao, formato, data_referencia, filtros)
+    st.download_button(
+        label=f"📥 Baixar {VISOES_EXPORTACAO[visao]} ({formato.upper()})",
+        data=conteudo,
+        file_name=f"{visao}_equipes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extensao}",
+        mime=mime
+    )
+
+
+def perfil_em_bytes(perfil: cProfile.Profile) -> bytes:
+    """Estatísticas no mesmo formato de Profile.dump_stats (legível por pstats/snakeviz)"""
+    perfil.create_stats()
+    return marshal.dumps(perfil.stats)
+
+
+def show_admin_panel(analyzer):
+    """Painel de diagnóstico na sidebar, visível apenas com ?admin=1 na URL"""
+    with st.sidebar.expander("🛠️ Diagnóstico", expanded=False):
+        st.write("**Tempos por etapa:**")
+        st.dataframe(METRICAS.resumo(), use_container_width=True)
+
+        contadores = METRICAS.contadores_copia()
+        if contadores:
+            st.write("**Contadores (cache hit/miss):**")
+            st.dataframe(pd.Series(contadores, name='quantidade').sort_index(), use_container_width=True)
+
         st.download_button(
-            label="📥 Download CSV",
-            data=csv,
-            file_name=f"cronograma_equipes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+            "📥 Exportar métricas (JSON lines)",
+            data=METRICAS.exportar_jsonl(),
+            file_name=f"metricas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+            mime="application/x-ndjson"
         )
+        if st.button("🧹 Limpar métricas"):
+            METRICAS.limpar()
+
+        if st.checkbox("Mostrar memória por coluna"):
+            st.dataframe(analyzer.relatorio_memoria(), use_container_width=True)
+
+        # Perfil opcional: a próxima execução da página roda dentro do cProfile
+        if st.button("🧪 Perfilar a próxima execução (cProfile)"):
+            st.session_state['perfilar'] = True
+            st.rerun()
+        if 'perfil' in st.session_state:
+            st.download_button(
+                "📥 Baixar perfil (.prof)",
+                data=st.session_state['perfil'],
+                file_name=f"perfil_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof",
+                mime="application/octet-stream"
+            )
+            st.code(st.session_state['perfil_resumo'])
 
 
 def main():
@@ -829,26 +805,87 @@ def main():
         "Selecione a página:",
         ["📋 Cronograma por Encarregado", "🗺️ Mapa das Equipes", "🔍 Auditoria de Folgas", "📊 Relatórios"]
     )
+    data_referencia = st.sidebar.date_input(
+        "📅 Data de referência", value=datetime.now().date(), format="DD/MM/YYYY"
+    )
 
     # Carregar dados
+    repositorio = obter_repositorio()
+    connector = repositorio.connector
+    chamada = time.time()
+    inicio = time.perf_counter()
     with st.spinner("Carregando dados do SharePoint..."):
-        connector = SharePointConnector()
-        df = connector.get_data()
+        analyzer = repositorio.obter()
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+
+    if connector.erro is not None:
+        st.error(f"Erro ao conectar com SharePoint: {connector.erro}")
 
-    if df is None:
+    if analyzer is None:
         st.error("❌ Não foi possível carregar os dados. Verifique a conexão com o SharePoint.")
         st.stop()
 
-    analyzer = CronogramaAnalyzer(df)
+    if getattr(analyzer, 'construido_em', 0) >= chamada:
+        st.sidebar.caption(f"🔄 Dados reprocessados em {duracao_ms:.0f} ms")
+    else:
+        st.sidebar.caption(f"⚡ Dados em cache ({duracao_ms:.1f} ms)")
+
+    # Idade dos dados: a atualização agendada roda em segundo plano a cada TTL
+    idade = repositorio.idade()
+    if idade is not None:
+        texto = f"🕒 Dados verificados há {texto_idade(idade)}"
+        if idade > 2 * repositorio.TTL:
+            st.sidebar.warning(texto)
+        else:
+            st.sidebar.caption(texto)
+
+    if repositorio.offline:
+        st.sidebar.warning("📴 SharePoint indisponível: exibindo o snapshot local.")
+    elif repositorio.fonte == 'snapshot':
+        st.sidebar.caption("💾 Exibindo snapshot local enquanto o SharePoint é consultado...")
+
+    if connector.regioes_indisponiveis:
+        st.sidebar.warning("⚠️ Planilhas não carregadas: " + ", ".join(connector.regioes_indisponiveis))
+
+    # Efetivo mínimo configurado sobre todas as bases, antes do filtro por região
+    configurar_efetivo_minimo(analyzer)
+
+    # Filtro por região (uma planilha por região), aplicado a todas as páginas
+    if len(analyzer.regioes) > 1:
+        regiao = st.sidebar.selectbox("🧭 Região", ["Todas"] + analyzer.regioes)
+        if regiao != "Todas":
+            analyzer = analyzer.da_regiao(regiao)
+
+    tempos = connector.tempos_copia()
+    if tempos:
+        st.sidebar.caption("⏱️ SharePoint: " + " | ".join(
+            f"{fase} {segundos * 1000:.0f} ms" for fase, segundos in tempos.items()
+        ))
+
+    admin = modo_admin()
+    perfil = None
+    if admin and st.session_state.pop('perfilar', False):
+        perfil = cProfile.Profile()
+        perfil.enable()
 
     if page == "📋 Cronograma por Encarregado":
-        show_cronograma_encarregado(analyzer)
+        show_cronograma_encarregado(analyzer, data_referencia)
     elif page == "🗺️ Mapa das Equipes":
-        show_map_page(analyzer)
+        show_map_page(analyzer, data_referencia)
     elif page == "🔍 Auditoria de Folgas":
-        show_audit_page(analyzer)
+        show_audit_page(analyzer, data_referencia=data_referencia)
     elif page == "📊 Relatórios":
-        show_reports_page(analyzer)
+        show_reports_page(analyzer, data_referencia)
+
+    if perfil is not None:
+        perfil.disable()
+        resumo = io.StringIO()
+        pstats.Stats(perfil, stream=resumo).sort_stats('cumulative').print_stats(25)
+        st.session_state['perfil_resumo'] = resumo.getvalue()
+        st.session_state['perfil'] = perfil_em_bytes(perfil)
+
+    if admin:
+        show_admin_panel(analyzer)
 
 
 if __name__ == "__main__":
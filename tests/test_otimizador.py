@@ -0,0 +1,31 @@
+"""OtimizadorFolgas: a proposta nunca aumenta os dias com base abaixo do efetivo mínimo."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from cronograma_core import CronogramaAnalyzer
+
+REFERENCIA = date(2026, 10, 18)
+
+
+def escala(semente: int) -> pd.DataFrame:
+    """40 colaboradores em 4 bases, 6 folgas cada, com intervalos frequentemente curtos"""
+    gerador = np.random.default_rng(semente)
+    bases = ['Belém', 'Marabá', 'Santarém', 'Juruti']
+    linhas = []
+    for pessoa in range(40):
+        inicio = pd.Timestamp(REFERENCIA) + pd.Timedelta(days=int(gerador.integers(-10, 20)))
+        for _ in range(6):
+            duracao = int(gerador.integers(5, 15))
+            linhas.append((f"COLABORADOR {pessoa}", inicio, inicio + pd.Timedelta(days=duracao), bases[pessoa % 4]))
+            inicio += pd.Timedelta(days=duracao + int(gerador.integers(5, 45)))
+    df = pd.DataFrame(linhas, columns=['COLABORADOR', 'INICIO', 'TERMINO', 'ORIGEM'])
+    return df.assign(**{'BASE/CAMPO': pd.NaT, 'DESTINO': 'Belém', 'SUPERVISOR': 'SUPERVISOR', 'MÊS': '10/2026'})
+
+
+def test_proposta_nao_piora_o_efetivo():
+    for semente in range(5):
+        _, resumo = CronogramaAnalyzer(escala(semente)).propor_ajustes(REFERENCIA, 30, 5)
+        assert resumo['dias_abaixo_minimo_depois'] <= resumo['dias_abaixo_minimo_antes']
+        assert resumo['violacoes_depois'] < resumo['violacoes_antes']
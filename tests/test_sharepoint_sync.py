@@ -0,0 +1,133 @@
+"""Sincronização com o SharePoint contra um servidor Graph local (sem rede nem MSAL)."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+import cronograma_sharepoint
+from cronograma_sharepoint import SharePointConnector
+
+ITEM_ID = "item1"
+
+
+def planilha_xlsx() -> bytes:
+    df = pd.DataFrame({
+        'COLABORADOR': ['ANA', 'BRUNO'],
+        'INICIO': pd.to_datetime(['2026-01-05', '2026-02-10']),
+        'TERMINO': pd.to_datetime(['2026-01-15', '2026-02-20']),
+        'BASE/CAMPO': pd.to_datetime(['2026-01-17', '2026-02-22']),
+        'ORIGEM': ['Belém', 'Marabá'],
+        'DESTINO': ['Santarém', 'Belém'],
+        'SUPERVISOR': ['CARLOS', 'CARLOS'],
+        'MÊS': ['01/2026', '02/2026'],
+    })
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+class GraphLocal(BaseHTTPRequestHandler):
+    """Responde às rotas do Graph usadas pelo conector; registra os caminhos pedidos"""
+    protocol_version = 'HTTP/1.1'
+    estado = {}
+
+    def log_message(self, *args):
+        pass
+
+    def responder(self, codigo: int, corpo: bytes = b'', cabecalhos: dict = None):
+        self.send_response(codigo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        estado = self.estado
+        estado['pedidos'].append(self.path)
+        item = {'id': ITEM_ID, 'name': SharePointConnector.NOME_ARQUIVO,
+                'eTag': estado['etag'], 'cTag': estado['ctag']}
+
+        if self.path.endswith('/content'):
+            if self.headers.get('If-None-Match') == estado['etag']:
+                return self.responder(304)
+            estado['transferencias'] += 1
+            return self.responder(200, estado['conteudo'], {'ETag': estado['etag']})
+        if '/search(' in self.path:
+            return self.responder(200, json.dumps({'value': [item]}).encode())
+        if f'/items/{ITEM_ID}' in self.path:
+            return self.responder(200, json.dumps(item).encode())
+        if self.path.startswith('/sites/'):
+            return self.responder(200, json.dumps({'id': 'site1'}).encode())
+        self.responder(404)
+
+
+class AppMsal:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def acquire_token_for_client(self, scopes):
+        return {'access_token': 'token'}
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    GraphLocal.estado = {'pedidos': [], 'transferencias': 0, 'etag': '"e1"', 'ctag': '"c1"', 'conteudo': planilha_xlsx()}
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), GraphLocal)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(cronograma_sharepoint, 'ConfidentialClientApplication', AppMsal)
+    monkeypatch.setattr(SharePointConnector, 'GRAPH_URL', f"http://127.0.0.1:{servidor.server_port}")
+    yield GraphLocal.estado
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def pedidos_de_conteudo(estado) -> int:
+    return sum(pedido.endswith('/content') for pedido in estado['pedidos'])
+
+
+def test_primeira_sincronizacao_baixa_a_planilha(graph):
+    connector = SharePointConnector('cliente', 'segredo', 'tenant')
+    df, versao = connector.get_data()
+
+    assert connector.erro is None
+    assert len(df) == 2
+    assert versao == '"c1"'
+    assert graph['transferencias'] == 1
+
+
+def test_ctag_inalterado_nao_baixa_conteudo(graph):
+    connector = SharePointConnector('cliente', 'segredo', 'tenant')
+    df, versao = connector.get_data()
+    graph['pedidos'].clear()
+
+    df2, versao2 = connector.get_data()
+
+    assert pedidos_de_conteudo(graph) == 0
+    assert graph['transferencias'] == 1
+    assert df2 is df
+    assert versao2 == versao
+    assert connector.downloads == 1
+
+
+def test_resposta_304_nao_transfere_conteudo(graph):
+    connector = SharePointConnector('cliente', 'segredo', 'tenant')
+    df, versao = connector.get_data()
+    graph['pedidos'].clear()
+
+    # cTag novo (ex.: metadados alterados) com o mesmo eTag: o servidor responde 304
+    graph['ctag'] = '"c2"'
+    bytes_antes = connector.bytes_baixados
+    df2, versao2 = connector.get_data()
+
+    # Apenas o GET condicional, sem corpo
+    assert pedidos_de_conteudo(graph) == 1
+    assert graph['transferencias'] == 1
+    assert connector.bytes_baixados == bytes_antes
+    assert connector.downloads == 1
+    assert df2 is df
+    assert versao2 == versao
@@ -0,0 +1,46 @@
+"""Linhas apontadas por validar_folgas: as da planilha de origem, ao vivo, por região e após o snapshot."""
+import io
+
+import pandas as pd
+
+from cronograma_core import CronogramaAnalyzer, SnapshotStore, ler_planilha_folgas
+
+
+def planilha_xlsx(colaboradores, inicios, terminos) -> io.BytesIO:
+    df = pd.DataFrame({
+        'COLABORADOR': colaboradores,
+        'INICIO': pd.to_datetime(inicios),
+        'TERMINO': pd.to_datetime(terminos),
+        'BASE/CAMPO': pd.to_datetime(terminos) + pd.Timedelta(days=2),
+        'ORIGEM': 'Belém',
+        'DESTINO': 'Marabá',
+        'SUPERVISOR': 'SUPERVISOR',
+        'MÊS': '01/2026',
+    })
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def sobreposicoes(analyzer):
+    achados = analyzer.validar_folgas()
+    achados = achados[achados['tipo'] == 'SOBREPOSICAO']
+    return list(zip(achados['regiao'], achados['linha'], achados['linha_referencia']))
+
+
+def test_linhas_da_planilha_por_regiao_e_apos_snapshot(tmp_path):
+    # Na região SUL a linha 4 da planilha sobrepõe a linha 3 (a linha 2 não tem colaborador)
+    norte = ler_planilha_folgas(planilha_xlsx(['ANA', 'BRUNO'], ['2026-01-01', '2026-02-01'],
+                                              ['2026-01-10', '2026-02-10']))
+    sul = ler_planilha_folgas(planilha_xlsx([None, 'CARLA', 'CARLA'], ['2026-01-01', '2026-01-01', '2026-01-05'],
+                                            ['2026-01-10', '2026-01-10', '2026-01-12']))
+    df = pd.concat([norte.assign(regiao='NORTE'), sul.assign(regiao='SUL')], ignore_index=True)
+
+    analyzer = CronogramaAnalyzer(df)
+    assert sobreposicoes(analyzer) == [('SUL', 4, 3)]
+
+    snapshot = SnapshotStore(str(tmp_path / 'cronograma.parquet'))
+    snapshot.salvar(analyzer.df, 'v1')
+    df_snapshot, _ = snapshot.carregar()
+    assert sobreposicoes(CronogramaAnalyzer.from_processed(df_snapshot)) == [('SUL', 4, 3)]
@@ -0,0 +1,65 @@
+"""VerificadorEfetivo contra uma contagem direta, dia a dia, das folgas da mesma base."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from cronograma_core import CronogramaAnalyzer
+
+REFERENCIA = date(2026, 10, 18)
+
+
+def planilha(linhas: int, semente: int = 0) -> pd.DataFrame:
+    gerador = np.random.default_rng(semente)
+    bases = ['Belém', 'Marabá', 'Santarém', 'Juruti']
+    inicio = pd.Timestamp(REFERENCIA) + pd.to_timedelta(gerador.integers(-60, 120, linhas), unit='D')
+    return pd.DataFrame({
+        'COLABORADOR': [f"COLABORADOR {i % (linhas // 3 + 1)}" for i in range(linhas)],
+        'INICIO': inicio,
+        'TERMINO': inicio + pd.to_timedelta(gerador.integers(0, 20, linhas), unit='D'),
+        'BASE/CAMPO': pd.NaT,
+        'ORIGEM': gerador.choice(bases, linhas),
+        'DESTINO': 'Belém',
+        'SUPERVISOR': 'SUPERVISOR',
+        'MÊS': '10/2026',
+    })
+
+
+def test_confere_com_contagem_direta():
+    analyzer = CronogramaAnalyzer(planilha(300))
+    resultado = analyzer.verificar_efetivo(REFERENCIA, {'Juruti': 3}, 2)
+    assert not resultado.empty
+
+    folgas = analyzer.df.dropna(subset=['inicio', 'termino', 'origem'])
+    folgas = folgas[folgas['termino'] >= folgas['inicio']]
+    efetivo = analyzer.efetivo_por_base()
+    for indice, linha in resultado.iterrows():
+        folga = analyzer.df.loc[indice]
+        colegas = folgas[(folgas['origem'] == folga['origem']) & (folgas.index != indice)]
+        dias = pd.date_range(folga['inicio'], folga['termino'])
+        ausentes = [int(((colegas['inicio'] <= dia) & (colegas['termino'] >= dia)).sum()) for dia in dias]
+        tocam = (colegas['inicio'] <= folga['termino']) & (colegas['termino'] >= folga['inicio'])
+
+        assert linha['colegas_ausentes'] == int(tocam.sum())
+        assert linha['pico_ausentes'] == max(ausentes)
+        assert linha['em_servico'] == efetivo[folga['origem']] - 1 - max(ausentes)
+        assert linha['minimo'] == (3 if folga['origem'] == 'Juruti' else 2)
+        assert linha['atende'] == (linha['em_servico'] >= linha['minimo'])
+
+
+def test_folga_futura_sem_origem_fica_de_fora():
+    df = pd.DataFrame({
+        'COLABORADOR': ['ANA', 'BRUNO', 'CARLA'],
+        'INICIO': pd.to_datetime(['2026-10-20', '2026-10-22', '2026-11-25']),
+        'TERMINO': pd.to_datetime(['2026-10-25', '2026-10-30', '2026-12-05']),
+        'BASE/CAMPO': pd.NaT,
+        'ORIGEM': ['Belém', 'Belém', None],
+        'DESTINO': 'Marabá',
+        'SUPERVISOR': 'SUPERVISOR',
+        'MÊS': '10/2026',
+    })
+    resultado = CronogramaAnalyzer(df).verificar_efetivo(REFERENCIA)
+
+    assert list(resultado['origem']) == ['Belém', 'Belém']
+    assert list(resultado['pico_ausentes']) == [1, 1]
+    assert list(resultado['em_servico']) == [0, 0]